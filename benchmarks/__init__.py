@@ -0,0 +1,12 @@
+"""pyrkbun benchmark suite
+
+Benchmarks run against the in-process API simulator (pyrkbun.simulator) so
+they measure pyrkbun's own overhead and never touch live domains.
+
+Run all benchmarks, each in its own process so peak RSS is reported per
+benchmark module:
+    python -m benchmarks.run
+
+Run a single module, optionally writing JSON results for comparison:
+    python -m benchmarks.bench_api_post --json
+"""
@@ -0,0 +1,55 @@
+"""Per call overhead of pyrkbun.util.api_post
+
+Compares api_post against a bare pooled httpx client posting to the same
+simulator transport, isolating the cost added by pyrkbun (auth handling,
+rate limiting, retry policy and response parsing).
+"""
+import httpx
+
+from pyrkbun.util import api_post, get_transport, add_auth
+from pyrkbun.client import PorkbunClient
+from pyrkbun.metrics import MetricsCollector
+from benchmarks.common import measure, summarise, simulated, parse_args, report
+
+DOMAIN = 'example.com'
+
+def run(iterations: int = 2000) -> list:
+    """Run api_post overhead benchmarks"""
+    results = []
+    with simulated() as simulator:
+        simulator.add_domain(DOMAIN, [{'name': f'host{number}', 'type': 'A',
+                                       'content': '198.51.100.45'} for number in range(10)])
+        client = httpx.Client(transport=get_transport()[0])
+        payload = {}
+        add_auth(payload)
+        url = f'https://api.porkbun.com/api/json/v3/dns/retrieve/{DOMAIN}'
+        durations = measure(lambda: client.post(url, json=payload).json(), iterations)
+        results.append(summarise('httpx_baseline_retrieve', durations))
+
+        durations = measure(lambda: api_post(f'/dns/retrieve/{DOMAIN}'), iterations)
+        results.append(summarise('api_post_retrieve', durations))
+
+        with PorkbunClient(transport=get_transport()[0], rate_limit=0) as porkbun:
+            durations = measure(lambda: porkbun.post(f'/dns/retrieve/{DOMAIN}'), iterations)
+        results.append(summarise('client_post_retrieve', durations))
+
+        with PorkbunClient(transport=get_transport()[0], rate_limit=0) as porkbun:
+            MetricsCollector().install(porkbun)
+            durations = measure(lambda: porkbun.post(f'/dns/retrieve/{DOMAIN}'), iterations)
+        results.append(summarise('client_post_retrieve_metrics', durations))
+
+        durations = measure(lambda: api_post('/ping'), iterations)
+        results.append(summarise('api_post_ping', durations))
+
+        record = {'name': 'bench', 'type': 'TXT', 'content': 'benchmark'}
+        durations = measure(lambda: api_post(f'/dns/create/{DOMAIN}', dict(record)), iterations)
+        results.append(summarise('api_post_create', durations))
+    return results
+
+def main() -> None:
+    """Run from the command line"""
+    args = parse_args(__doc__)
+    report(run(args.iterations or 2000), args.json)
+
+if __name__ == '__main__':
+    main()
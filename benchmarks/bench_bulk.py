@@ -0,0 +1,85 @@
+"""CLI bulk operation planning and throughput
+
+merge planning: run_dns_bulk in merge mode where the input file matches the
+    existing zone, so no edits are made and the time is spent retrieving
+    and comparing records.
+diff: diff_records of a zone against the same records without IDs, so
+    every record is matched by name, type and content.
+throughput: run_dns_bulk in add mode against a simulator with per request
+    latency, across increasing -concurrency levels.
+"""
+import io
+import os
+import json
+import argparse
+import tempfile
+from contextlib import redirect_stdout
+
+from pyrkbun.cli import run_dns_bulk
+from pyrkbun.diff import diff_records
+from benchmarks.common import measure, summarise, simulated, synthetic_records
+from benchmarks.common import parse_args, report
+
+DOMAIN = 'example.com'
+SIZES = '10,100,1000,2000'
+CONCURRENCY = (1, 4, 16, 64)
+
+def bulk_args(input_file: str, output_file: str, mode: str, concurrency: int = 1):
+    """Build CLI arguments for run_dns_bulk"""
+    return argparse.Namespace(domain=DOMAIN, input=input_file, output=output_file,
+                              mode=mode, incns=False, concurrency=concurrency)
+
+def run_quietly(args: argparse.Namespace) -> None:
+    """Run a bulk operation discarding console output"""
+    with redirect_stdout(io.StringIO()):
+        run_dns_bulk(args)
+
+def run(sizes: list, iterations: int = None, records: int = 500, latency: float = 0.01) -> list:
+    """Run bulk planning and throughput benchmarks"""
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        input_file = os.path.join(workdir, 'input.json')
+        output_file = os.path.join(workdir, 'output.json')
+
+        with simulated() as simulator:
+            for size in sizes:
+                simulator.add_domain(DOMAIN)
+                existing = synthetic_records(DOMAIN, size)
+                with simulator._lock: # pylint: disable = protected-access
+                    for record in existing:
+                        simulator.zones[DOMAIN][record['id']] = dict(record)
+                user_records = [dict(record, name=record['name'].removesuffix(f'.{DOMAIN}'))
+                                for record in existing]
+                with open(input_file, 'w', encoding='utf8') as file:
+                    json.dump(user_records, file)
+                args = bulk_args(input_file, output_file, 'merge')
+                durations = measure(lambda: run_quietly(args),
+                                    iterations or max(3, min(50, 20000 // size)))
+                results.append(summarise(f'bulk_merge_plan_{size}', durations, size,
+                                         records=size))
+                desired = [{key: value for key, value in record.items() if key != 'id'}
+                           for record in user_records]
+                durations = measure(lambda: diff_records(existing, desired, DOMAIN),
+                                    iterations or max(3, min(50, 20000 // size)))
+                results.append(summarise(f'bulk_diff_{size}', durations, size, records=size))
+
+        user_records = [{'name': f'bulk{number}', 'type': 'A', 'content': '198.51.100.45',
+                         'ttl': '600', 'prio': '0', 'notes': ''} for number in range(records)]
+        with open(input_file, 'w', encoding='utf8') as file:
+            json.dump(user_records, file)
+        for concurrency in CONCURRENCY:
+            with simulated(latency=latency):
+                args = bulk_args(input_file, output_file, 'add', concurrency)
+                durations = measure(lambda: run_quietly(args), iterations or 3, warmup=0)
+            results.append(summarise(f'bulk_add_concurrency_{concurrency}', durations, records,
+                                     records=records, concurrency=concurrency,
+                                     latency_ms=latency * 1000))
+    return results
+
+def main() -> None:
+    """Run from the command line"""
+    args = parse_args(__doc__, SIZES)
+    report(run(args.sizes, args.iterations), args.json)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Dns record construction cost for zones of increasing size
+
+Measures building Dns instances from an API response (the formatter used
+by Dns.get_records), the memory held per record and a full Dns.get_records round trip through the
+simulator for each zone size, along with the streaming Dns.iter_records.
+"""
+import tracemalloc
+
+import pyrkbun
+from pyrkbun.dns import _records_from_response
+from benchmarks.common import measure, summarise, simulated, synthetic_records
+from benchmarks.common import parse_args, report
+
+DOMAIN = 'example.com'
+SIZES = '10,100,1000,10000,100000'
+
+def iterations_for(size: int) -> int:
+    """Scale iterations down as zones grow to keep run time bounded"""
+    return max(5, min(500, 200000 // size))
+
+def run(sizes: list, iterations: int = None) -> list:
+    """Run Dns construction benchmarks"""
+    results = []
+    for size in sizes:
+        response = {'status': 'SUCCESS', 'records': synthetic_records(DOMAIN, size)}
+        durations = measure(lambda: _records_from_response(pyrkbun.dns, DOMAIN, response),
+                            iterations or iterations_for(size))
+        results.append(summarise(f'dns_construct_{size}', durations, size, records=size))
+        tracemalloc.start()
+        records = _records_from_response(pyrkbun.dns, DOMAIN, response)
+        allocated = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del records
+        results.append(summarise(f'dns_memory_{size}', [0.0], size, records=size,
+                                 bytes_per_record=round(allocated / size, 1)))
+
+    with simulated() as simulator:
+        for size in sizes:
+            simulator.add_domain(DOMAIN)
+            with simulator._lock: # pylint: disable = protected-access
+                for record in synthetic_records(DOMAIN, size):
+                    simulator.zones[DOMAIN][record['id']] = record
+            durations = measure(lambda: pyrkbun.dns.get_records(DOMAIN),
+                                iterations or max(3, iterations_for(size) // 5))
+            results.append(summarise(f'dns_get_records_{size}', durations, size, records=size))
+            durations = measure(lambda: sum(1 for _ in pyrkbun.dns.iter_records(DOMAIN)),
+                                iterations or max(3, iterations_for(size) // 5))
+            results.append(summarise(f'dns_iter_records_{size}', durations, size, records=size))
+    return results
+
+def main() -> None:
+    """Run from the command line"""
+    args = parse_args(__doc__, SIZES)
+    report(run(args.sizes, args.iterations), args.json)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""PricingTable construction and query cost
+
+Measures building a PricingTable from a simulated pricing response and
+typical filter, sort and cheapest queries against it, with and without
+NumPy when it is installed, plus bulk domain quoting by longest TLD suffix.
+"""
+from pyrkbun.pricing import PricingTable, numpy
+from pyrkbun.simulator import PorkbunSimulator
+from benchmarks.common import measure, summarise, parse_args, report
+
+SIZES = '500,5000'
+QUOTE_DOMAINS = 100000
+
+def run(sizes: list, iterations: int = None) -> list:
+    """Run pricing table benchmarks"""
+    results = []
+    for size in sizes:
+        # pylint: disable = protected-access
+        response = {'status': 'SUCCESS', 'pricing': PorkbunSimulator(seed=0)._build_pricing(size)}
+        for use_numpy in ((False, True) if numpy is not None else (False,)):
+            label = f'{"numpy" if use_numpy else "array"}_{size}'
+            durations = measure(lambda: PricingTable(response, use_numpy),
+                                iterations or max(5, 20000 // size))
+            results.append(summarise(f'pricing_table_build_{label}', durations, tlds=size))
+            table = PricingTable(response, use_numpy)
+            queries = {'cheapest_renewal_below': lambda: table.cheapest(20, renewal=10),
+                       'filter_coupons': lambda: table.filter(coupons=True),
+                       'sort_renewal': lambda: table.sort('renewal'),
+                       'lookup': lambda: table['com']}
+            for name, query in queries.items():
+                durations = measure(query, iterations or max(50, 500000 // size))
+                results.append(summarise(f'pricing_{name}_{label}', durations, tlds=size))
+
+        table = PricingTable(response, False)
+        domains = [f'name{number}.{"sub." * (number % 3)}{table.tlds[number % size]}'
+                   for number in range(QUOTE_DOMAINS)]
+        durations = measure(lambda: sum(1 for _ in table.quote(domains)), iterations or 5)
+        results.append(summarise(f'pricing_quote_{size}', durations, QUOTE_DOMAINS, tlds=size,
+                                 domains=QUOTE_DOMAINS))
+    return results
+
+def main() -> None:
+    """Run from the command line"""
+    args = parse_args(__doc__, SIZES)
+    report(run(args.sizes, args.iterations), args.json)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""BIND zone file import and export cost
+
+parse: parse_zone of a zone file written by format_zone, with one in five
+    records a quoted TXT record, for zones of increasing size.
+format: format_zone of API formatted records.
+"""
+from pyrkbun.zonefile import format_zone, parse_zone
+from benchmarks.common import measure, summarise, synthetic_records
+from benchmarks.common import parse_args, report
+
+DOMAIN = 'example.com'
+SIZES = '1000,10000,100000'
+
+def run(sizes: list, iterations: int = None) -> list:
+    """Run zone file benchmarks"""
+    results = []
+    for size in sizes:
+        records = synthetic_records(DOMAIN, size)
+        lines = list(format_zone(records, DOMAIN))
+        count = iterations or max(3, min(50, 200000 // size))
+        durations = measure(lambda: sum(1 for _ in parse_zone(lines, DOMAIN)), count)
+        results.append(summarise(f'zonefile_parse_{size}', durations, size, lines=len(lines)))
+        durations = measure(lambda: sum(1 for _ in format_zone(records, DOMAIN)), count)
+        results.append(summarise(f'zonefile_format_{size}', durations, size, records=size))
+    return results
+
+def main() -> None:
+    """Run from the command line"""
+    args = parse_args(__doc__, SIZES)
+    report(run(args.sizes, args.iterations), args.json)
+
+if __name__ == '__main__':
+    main()
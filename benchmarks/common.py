@@ -0,0 +1,110 @@
+"""Shared benchmark helpers
+"""
+import sys
+import json
+import time
+import argparse
+import resource
+import statistics
+from contextlib import contextmanager
+from typing import Callable
+
+from pyrkbun.util import RATE_LIMITER
+from pyrkbun.simulator import PorkbunSimulator
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and KiB elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def measure(func: Callable, iterations: int, warmup: int = 1) -> list:
+    """Call func repeatedly, returning the duration of each call in seconds"""
+    for _ in range(warmup):
+        func()
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+def summarise(name: str, durations: list, ops_per_call: int = 1, **extra) -> dict:
+    """Summarise call durations as throughput and latency percentiles"""
+    total = sum(durations)
+    if len(durations) > 1:
+        centiles = statistics.quantiles(durations, n=100, method='inclusive')
+        p50, p95, p99 = centiles[49], centiles[94], centiles[98]
+    else:
+        p50 = p95 = p99 = durations[0]
+    result = {'benchmark': name,
+              'calls': len(durations),
+              'ops_per_sec': round(len(durations) * ops_per_call / total, 1) if total else None,
+              'p50_ms': round(p50 * 1000, 4),
+              'p95_ms': round(p95 * 1000, 4),
+              'p99_ms': round(p99 * 1000, 4),
+              'peak_rss_mb': round(peak_rss_mb(), 1)}
+    result.update(extra)
+    return result
+
+@contextmanager
+def simulated(**kwargs):
+    """Route API calls to a fresh simulator with rate limiting disabled"""
+    rate, burst = RATE_LIMITER.rate, RATE_LIMITER.burst
+    RATE_LIMITER.configure(0)
+    simulator = PorkbunSimulator(seed=0, **kwargs)
+    try:
+        with simulator:
+            yield simulator
+    finally:
+        RATE_LIMITER.configure(rate, burst)
+
+def synthetic_records(domain: str, count: int) -> list:
+    """Build count API formatted records for domain"""
+    types = ('A', 'AAAA', 'CNAME', 'TXT', 'MX')
+    contents = {'A': '198.51.100.{0}',
+                'AAAA': '2001:db8::{0:x}',
+                'CNAME': 'target{0}.example.net',
+                'TXT': 'v=spf1 include:_spf{0}.example.net -all',
+                'MX': 'mx{0}.example.net'}
+    records = []
+    for number in range(count):
+        record_type = types[number % len(types)]
+        records.append({'id': str(200000000 + number),
+                        'name': f'host{number}.{domain}',
+                        'type': record_type,
+                        'content': contents[record_type].format(number % 250),
+                        'ttl': '600',
+                        'prio': '10' if record_type == 'MX' else '0',
+                        'notes': ''})
+    return records
+
+def parse_args(description: str, default_sizes: str = None) -> argparse.Namespace:
+    """Parse the command line options common to benchmark modules"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--json', action='store_true', help='Print results as JSON lines')
+    parser.add_argument('--iterations', type=int, default=None,
+                        help='Override the number of timed iterations')
+    if default_sizes:
+        parser.add_argument('--sizes', default=default_sizes,
+                            help=f'Comma separated sizes to run. Defaults to {default_sizes}')
+    args = parser.parse_args()
+    if default_sizes:
+        args.sizes = [int(size) for size in args.sizes.split(',')]
+    return args
+
+def report(results: list, as_json: bool = False) -> None:
+    """Print benchmark results as a table or JSON lines"""
+    if as_json:
+        for result in results:
+            print(json.dumps(result))
+        return
+    columns = ['benchmark', 'calls', 'ops_per_sec', 'p50_ms', 'p95_ms', 'p99_ms', 'peak_rss_mb']
+    extra = sorted({key for result in results for key in result} - set(columns))
+    columns.extend(extra)
+    rows = [[str(result.get(column, '')) for column in columns] for result in results]
+    widths = [max(len(column), *(len(row[index]) for row in rows))
+              for index, column in enumerate(columns)]
+    print('  '.join(column.ljust(width) for column, width in zip(columns, widths)))
+    for row in rows:
+        print('  '.join(value.ljust(width) for value, width in zip(row, widths)))
@@ -0,0 +1,41 @@
+"""Run the pyrkbun benchmark suite
+
+Each benchmark module runs in its own process so that peak RSS is reported
+per module. Results can be saved as JSON lines to compare releases.
+
+Usage:
+    python -m benchmarks.run [--only bench_dns] [--output results.jsonl]
+"""
+import sys
+import json
+import argparse
+import subprocess
+
+from benchmarks.common import report
+
+MODULES = ('bench_api_post', 'bench_dns', 'bench_bulk', 'bench_pricing', 'bench_zonefile')
+
+def main() -> None:
+    """Run selected benchmark modules and report their results"""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', action='append', choices=MODULES,
+                        help='Benchmark module to run, may be repeated. Defaults to all')
+    parser.add_argument('--output', help='File to write JSON lines results to')
+    args = parser.parse_args()
+
+    results = []
+    for module in args.only or MODULES:
+        print(f'Running {module}', file=sys.stderr)
+        completed = subprocess.run([sys.executable, '-m', f'benchmarks.{module}', '--json'],
+                                   capture_output=True, text=True, check=True)
+        results.extend(json.loads(line) for line in completed.stdout.splitlines() if line)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf8') as file:
+            for result in results:
+                file.write(json.dumps(result) + '\n')
+    report(results)
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,17 @@
 '''
 from . import ssl
 from . import pricing
+from . import aio
+from . import metrics
+from . import cache
+from . import zone
+from . import diff
+from . import plan
+from . import zonefile
+from . import watch
+from . import ddns
 from .dns import Dns as dns
+from .zone import DnsZone
 from .util import api_ping as ping
+from .client import PorkbunClient
 from .const import ApiError, ApiFailure
@@ -0,0 +1,190 @@
+"""Porkbun API asyncio interface
+
+Coroutine based twins of the blocking pyrkbun API. All calls share a pooled
+httpx.AsyncClient per event loop so that many requests can be driven
+concurrently from a single thread.
+
+Example:
+>>> import asyncio
+>>> from pyrkbun import aio
+>>> async def main():
+...     records = await aio.AsyncDns.get_records('example.com', 'A')
+...     await asyncio.gather(*(record.delete() for record in records))
+>>> asyncio.run(main())
+"""
+import httpx
+
+from .const import BASE_URL, BASE_URL_V4, RETRIES
+from .client import PorkbunClient
+from .dns import Dns, API_PATH
+from .dns import _retrieve_path, _delete_path, _edit_path
+from .dns import _records_from_response, _record_payload, _refresh_from_response
+from .util import add_auth, strip_auth, default_client, _DEFAULT_CLIENTS
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+
+def get_http_client(retries: int = RETRIES) -> httpx.AsyncClient:
+    """Return the pooled async http client for the running event loop
+
+    Must be called from within a running event loop.
+    """
+    return default_client(retries).async_http_client()
+
+async def close_http_clients() -> None:
+    """Close the pooled http clients of the default clients"""
+    for client in list(_DEFAULT_CLIENTS.values()):
+        await client.aclose()
+
+async def api_post(path: str,
+                   payload: dict = None,
+                   auth: bool = True,
+                   force_v4: bool = False,
+                   retries: int = RETRIES,
+                   limiter: RateLimiter = None,
+                   policy: RetryPolicy = None,
+                   client: PorkbunClient = None) -> dict:
+    """Format request and post to API endpoint
+
+    Async equivalent of pyrkbun.util.api_post, see it for details.
+    """
+    if client is not None:
+        return await client.apost(path, payload, auth, force_v4, policy, limiter)
+    payload = {} if payload is None else payload
+    if auth:
+        add_auth(payload)
+    try:
+        return await default_client(retries).apost(path, payload, False, force_v4, policy,
+                                                   limiter, BASE_URL_V4 if force_v4 else BASE_URL)
+    finally:
+        strip_auth(payload)
+
+async def api_ping(ipv4: bool = False, client: PorkbunClient = None) -> dict:
+    """Basic request to poll API host and return your own IP
+
+    Example:
+    >>> response = await pyrkbun.aio.api_ping(ipv4=True)
+    >>> print(response)
+    {'status': 'SUCCESS', 'yourIp': '198.51.100.45'}
+    """
+    path = '/ping'
+    response = await api_post(path, force_v4=ipv4, client=client)
+    return response
+
+async def ssl_get(domain: str, client: PorkbunClient = None) -> dict:
+    """Retrieve the SSL certificate bundle for the domain.
+
+    Async equivalent of pyrkbun.ssl.get
+    """
+    path = f'/ssl/retrieve/{domain}'
+    response = await api_post(path, client=client)
+    return response
+
+async def pricing_get(client: PorkbunClient = None) -> dict:
+    """Check default domain pricing information for all supported TLDs
+
+    Async equivalent of pyrkbun.pricing.get
+    """
+    path = '/pricing/get'
+    response = await api_post(path, auth=False, client=client)
+    return response
+
+
+class AsyncDns(Dns):
+    '''Class representing a DNS record with coroutine API methods
+
+    Takes the same arguments as pyrkbun.dns. All class and instance methods
+    that call the API are coroutines and must be awaited.
+
+    Example:
+    >>> x = AsyncDns('example.com', 'A', '198.51.100.45', 'www')
+    >>> await x.create()
+    {'status': 'SUCCESS', 'id': 253916852}
+    >>> await x.delete()
+    {'status': 'SUCCESS'}
+    '''
+
+    __slots__ = ()
+
+    @classmethod
+    async def get_records(cls,
+                          domain: str,
+                          record_type: str = None,
+                          name: str = None,
+                          record_id: str = None) -> list['AsyncDns']:
+        """Get specific DNS records by ID or type and name
+
+        Async equivalent of pyrkbun.dns.get_records
+        """
+        path = _retrieve_path(domain, record_type, name, record_id)
+        response = await api_post(path, client=cls._client)
+        records = _records_from_response(cls, domain, response)
+        return records
+
+    @classmethod
+    async def create_record(cls,
+                            domain: str,
+                            record: dict) -> dict:
+        """Create a new DNS record
+
+        Async equivalent of pyrkbun.dns.create_record
+        """
+        path = f'{API_PATH}/create/{domain}/'
+        response = await api_post(path, record, client=cls._client)
+        return response
+
+    @classmethod
+    async def delete_record(cls,
+                            domain: str,
+                            record_type: str = None,
+                            name: str = None,
+                            record_id: str = None) -> dict:
+        """Delete a specific DNS record
+
+        Async equivalent of pyrkbun.dns.delete_record
+        """
+        path = _delete_path(domain, record_type, name, record_id)
+        response = await api_post(path, client=cls._client)
+        return response
+
+    @classmethod
+    async def edit_record(cls,
+                          domain: str,
+                          updates: dict,
+                          record_type: str = None,
+                          name: str = None,
+                          record_id: str = None) -> dict:
+        """Edit a specific DNS record
+
+        Async equivalent of pyrkbun.dns.edit_record
+        """
+        path = _edit_path(domain, record_type, name, record_id)
+        response = await api_post(path, updates, client=cls._client)
+        return response
+
+    async def refresh(self) -> dict:
+        """Refresh DNS class instance details from API"""
+        path = _retrieve_path(self.domain, record_id=self.record_id)
+        response = await api_post(path, client=self._client)
+        _refresh_from_response(self, response)
+        return response
+
+    async def create(self) -> dict:
+        """Create record based on class instance attributes"""
+        path = f'{API_PATH}/create/{self.domain}'
+        payload = _record_payload(self)
+        response = await api_post(path, payload, client=self._client)
+        self.record_id = response['id']
+        return response
+
+    async def update(self) -> dict:
+        """Update record based on class instance attributes"""
+        path = _edit_path(self.domain, record_id=self.record_id)
+        payload = _record_payload(self)
+        response = await api_post(path, payload, client=self._client)
+        return response
+
+    async def delete(self) -> dict:
+        """Delete DNS record represented by class instance"""
+        path = _delete_path(self.domain, record_id=self.record_id)
+        response = await api_post(path, client=self._client)
+        return response
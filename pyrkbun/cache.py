@@ -0,0 +1,198 @@
+"""API response caches
+
+RecordCache: In-process cache of DNS record retrievals
+DiskCache: Persistent cache of public API data such as pricing
+
+A RecordCache attached to a PorkbunClient answers repeated DNS retrieve
+requests from memory. Entries are keyed by domain, record type, name and
+record ID (the retrieve request path), expire after a time-to-live and the
+least recently used entries are evicted once the cache is full.
+
+Any create, edit or delete request made through the client invalidates the
+cached entries of the domain it touches, whether it succeeded or not.
+Changes made by other clients or outside of pyrkbun are only picked up
+once entries expire.
+
+Example:
+>>> import pyrkbun
+>>> from pyrkbun.cache import RecordCache
+>>> client = pyrkbun.PorkbunClient(cache=RecordCache(ttl=30))
+>>> client.dns.get_records('example.com')  # Sent to the API
+>>> client.dns.get_records('example.com')  # Served from cache
+"""
+import os
+import json
+import time
+import tempfile
+import threading
+from pathlib import Path
+from collections import OrderedDict
+
+from .const import CACHE_DIR
+from .retry import endpoint
+
+_READ_ENDPOINTS: set = {'/dns/retrieve', '/dns/retrieveByNameType'}
+_WRITE_ENDPOINTS: set = {'/dns/create', '/dns/edit', '/dns/editByNameType',
+                         '/dns/delete', '/dns/deleteByNameType'}
+
+def _copy(api_response: dict) -> dict:
+    """Copy a retrieve response so callers cannot modify cached records"""
+    result = dict(api_response)
+    if 'records' in result:
+        result['records'] = [dict(record) for record in result['records']]
+    return result
+
+
+class RecordCache():
+    '''Thread safe TTL and LRU cache of DNS retrieve responses
+
+    Args:
+    ttl (optional): Seconds a cached response remains valid. Defaults to 60
+    maxsize (optional): Maximum number of cached responses. Defaults to 1024
+
+    Usage:
+    Pass to PorkbunClient as the cache argument, or set the PYRK_CACHE_TTL
+    environment variable to enable a shared cache for module level calls.
+    Use invalidate() to drop entries after changes made outside of the
+    client.
+    '''
+
+    def __init__(self, ttl: float = 60.0, maxsize: int = 1024):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        self.ttl = float(ttl)
+        self.maxsize = int(maxsize)
+        self.hits: int = 0
+        self.misses: int = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+        self._generations: dict = {}
+        self._epoch: int = 0
+
+    def __repr__(self) -> str:
+        return f'RecordCache(ttl={self.ttl}, maxsize={self.maxsize})'
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(path: str) -> tuple:
+        """Return the cache key of a retrieve path, or None if not cacheable
+
+        Keys are tuples of the domain, endpoint and remaining path arguments.
+        """
+        if endpoint(path) not in _READ_ENDPOINTS:
+            return None
+        parts = [part for part in path.split('/') if part]
+        return (parts[2], parts[1]) + tuple(parts[3:])
+
+    @staticmethod
+    def domain(path: str) -> str:
+        """Return the domain changed by a write path, or None for other paths"""
+        if endpoint(path) not in _WRITE_ENDPOINTS:
+            return None
+        return [part for part in path.split('/') if part][2]
+
+    def generation(self, domain: str) -> tuple:
+        """Return the invalidation state of a domain
+
+        Taken before sending a retrieve request and passed to store(), so a
+        response racing with a write to the same domain is not cached.
+        """
+        return self._epoch, self._generations.get(domain, 0)
+
+    def lookup(self, key: tuple) -> dict:
+        """Return a copy of the cached response for key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return _copy(entry[1])
+
+    def store(self, key: tuple, api_response: dict, generation: tuple) -> None:
+        """Cache a retrieve response unless its domain changed since generation"""
+        with self._lock:
+            if self.generation(key[0]) != generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, _copy(api_response))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, domain: str = None) -> None:
+        """Drop cached responses for a domain, or for all domains"""
+        with self._lock:
+            if domain is None:
+                self._epoch += 1
+                self._entries.clear()
+                return
+            self._generations[domain] = self._generations.get(domain, 0) + 1
+            for key in [key for key in self._entries if key[0] == domain]:
+                del self._entries[key]
+
+
+class DiskCache():
+    '''Persistent JSON cache of an API response
+
+    Args:
+    name: File name of the cache entry
+    directory (optional): Cache directory. Defaults to CACHE_DIR
+
+    Usage:
+    Entries are written atomically, so readers in other processes never
+    see a partially written file. Cache failures (e.g. a read only home
+    directory) are ignored and treated as a cache miss.
+    '''
+
+    def __init__(self, name: str, directory: Path = None):
+        self.path = Path(directory if directory is not None else CACHE_DIR) / name
+
+    def __repr__(self) -> str:
+        return f'DiskCache({str(self.path)!r})'
+
+    def age(self) -> float:
+        """Return the seconds since the entry was written, or None if missing"""
+        try:
+            return max(0.0, time.time() - self.path.stat().st_mtime)
+        except OSError:
+            return None
+
+    def load(self) -> tuple:
+        """Return the (age in seconds, data) of the entry, or (None, None) if missing"""
+        age = self.age()
+        if age is None:
+            return None, None
+        try:
+            with open(self.path, 'rb') as file:
+                return age, json.loads(file.read())
+        except (OSError, ValueError):
+            return None, None
+
+    def save(self, data: dict) -> bool:
+        """Write the entry, returning False if it could not be written"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            handle, temporary = tempfile.mkstemp(dir=self.path.parent,
+                                                 prefix=f'.{self.path.name}.')
+            try:
+                with os.fdopen(handle, 'w', encoding='utf8') as file:
+                    json.dump(data, file, separators=(',', ':'))
+                os.replace(temporary, self.path)
+            except BaseException:
+                os.unlink(temporary)
+                raise
+        except OSError:
+            return False
+        return True
+
+    def clear(self) -> None:
+        """Remove the entry"""
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
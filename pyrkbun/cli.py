@@ -1,16 +1,26 @@
 """CLI Interface to pyrkbun
 """
 #! /usr/local/bin/python
+import sys
 import json
 import argparse
 from os import getenv
+from functools import partial
+from itertools import chain
+from typing import Iterator
 from colorama import init, Fore, Back, Style
 
 from . import ssl
 from . import pricing
 from .dns import Dns as dns
-from .util import api_ping
-from .const import ApiError, ApiFailure
+from .zone import load_zones
+from .plan import Plan, StalePlanError, make_plan, plan_phases, without_ns
+from .stream import iter_json_items
+from .zonefile import parse_zone, write_zone
+from .watch import ZoneWatcher
+from .ddns import DynamicDns
+from .util import api_ping, concurrent_map
+from .const import ApiError, ApiFailure, PRICING_MAX_AGE
 
 # init colorama
 init(autoreset=True)
@@ -26,6 +36,8 @@ SUPPORTED_DNS_RECORD_TYPES = {'A',
                               'TLSA',
                               'CAA'}
 
+COMPLETED = {'CREATE': 'CREATED', 'EDIT': 'EDITED', 'DELETE': 'DELETED'}
+
 def check_api_creds() -> bool:
     """CHeck API Creds have been set"""
     check_api_key: str = getenv('PYRK_API_KEY')
@@ -43,57 +55,69 @@ def check_api_creds() -> bool:
 
     return True
 
+# Single record create, edit and delete operations. These run on worker
+# threads during concurrent bulk operations and return a tuple of
+# (success, result, record) rather than printing
+def create_record(domain, record: dict) -> tuple:
+    """Create a single record in target domain"""
+    record.pop('domain', None)
+    record.pop('id', None)
+    try:
+        result = dns.create_record(domain, record)
+    except (ApiError, ApiFailure) as error:
+        return False, error.message, record
+    record.update({'id': str(result['id'])})
+    return True, result, record
+
+def delete_record(domain, record: dict) -> tuple:
+    """Delete a single record in target domain"""
+    try:
+        result = dns.delete_record(domain, record_id=record['id'])
+    except (ApiError, ApiFailure) as error:
+        return False, error.message, record
+    return True, result, record
+
+def edit_record(domain, record: dict) -> tuple:
+    """Edit a single record in target domain"""
+    record.pop('domain', None)
+    record_id = record.pop('id', None)
+    try:
+        result = dns.edit_record(domain, record, record_id=record_id)
+    except (ApiError, ApiFailure) as error:
+        return False, error.message, record
+    finally:
+        record.update({'id': record_id})
+    return True, result, record
+
+def run_records(operation, # pylint: disable = too-many-arguments
+                action: str, domain, records: list, concurrency: int = 1) -> dict:
+    """Run a single record operation over records, collecting results in input order"""
+    outcome: dict = {'SUCCESS': [], 'FAILURE': []}
+    outcomes = concurrent_map(partial(operation, domain), records, concurrency)
+    for success, result, record in outcomes:
+        if success:
+            print(f'{Fore.GREEN}{COMPLETED[action]} record:{record}{Style.RESET_ALL}')
+            outcome['SUCCESS'].append({'result': result, 'record': record})
+        else:
+            print(f'{Back.RED}{Fore.YELLOW}FAILED to {action} record:{record}')
+            outcome['FAILURE'].append({'result': result, 'record': record})
+    return outcome
+
 # Create, edit and delete fuctions to be called once user options are evaluated
-def create_records(domain, records: list):
+def create_records(domain, records: list, concurrency: int = 1):
     """Create records in target domain based on supplied records
     """
-    created: dict = {'SUCCESS': [], 'FAILURE': []}
-    for record in records:
-        record.pop('domain', None)
-        record.pop('id', None)
-        try:
-            result = dns.create_record(domain, record)
-        except (ApiError, ApiFailure) as error:
-            created['FAILURE'].append({'result': error.message, 'record': record})
-            print(f'{Back.RED}{Fore.YELLOW}FAILED to CREATE record:{record}')
-            continue
-        record.update({'id': str(result['id'])})
-        print(f'{Fore.GREEN}CREATED record:{record}')
-        created['SUCCESS'].append({'result': result, 'record': record})
-    return created
-
-def delete_records(domain, records: list):
+    return run_records(create_record, 'CREATE', domain, records, concurrency)
+
+def delete_records(domain, records: list, concurrency: int = 1):
     """Delete records in target domain based on supplied records
     """
-    deleted: dict = {'SUCCESS': [], 'FAILURE': []}
-    for record in records:
-        try:
-            result = dns.delete_record(domain, record_id=record['id'])
-        except (ApiError, ApiFailure) as error:
-            deleted['FAILURE'].append({'result': error.message, 'record': record})
-            print(f'{Back.RED}{Fore.YELLOW}FAILED to DELETE record:{record}')
-            continue
-        print(f'{Fore.GREEN}DELETED record:{record}')
-        deleted['SUCCESS'].append({'result': result, 'record': record})
-    return deleted
-
-def edit_records(domain, records: list):
+    return run_records(delete_record, 'DELETE', domain, records, concurrency)
+
+def edit_records(domain, records: list, concurrency: int = 1):
     """Edit records in target domain based on supplied records
     """
-    edited: dict = {'SUCCESS': [], 'FAILURE': []}
-    for record in records:
-        try:
-            record.pop('domain', None)
-            record_id = record.pop('id', None)
-            result = dns.edit_record(domain, record, record_id=record_id)
-            record.update({'id': record_id})
-        except (ApiError, ApiFailure) as error:
-            edited['FAILURE'].append({'result': error.message, 'record': record})
-            print(f'{Back.RED}{Fore.YELLOW}FAILED to EDIT record:{record}')
-            continue
-        print(f'{Fore.GREEN}EDITED record:{record}{Style.RESET_ALL}')
-        edited['SUCCESS'].append({'result': result, 'record': record})
-    return edited
+    return run_records(edit_record, 'EDIT', domain, records, concurrency)
 
 def run_ping(args: argparse.Namespace) -> str:
     """Run Ping"""
@@ -105,10 +129,10 @@ def run_ping(args: argparse.Namespace) -> str:
         return f'{Back.RED}{Fore.YELLOW}API Failure -> {error.message}'
     return json.dumps(result)
 
-def run_pricing(args: argparse.Namespace) -> str: # pylint: disable = unused-argument
+def run_pricing(args: argparse.Namespace) -> str:
     """Run Picing"""
     try:
-        result: dict = pricing.get()
+        result: dict = pricing.get(max_age=PRICING_MAX_AGE, refresh=args.refresh)
     except ApiError as error:
         return f'{Back.RED}{Fore.YELLOW}API Error -> {error.message}'
     except ApiFailure as error:
@@ -125,6 +149,14 @@ def run_ssl(args: argparse.Namespace) -> str:
         return f'{Back.RED}{Fore.YELLOW}API Failure -> {error.message}'
     return json.dumps(result)
 
+def record_output(record: dns) -> dict:
+    """Return a record in the format of API responses and bulk input files"""
+    result = record.to_dict()
+    result['type'] = result.pop('record_type')
+    result['id'] = result.pop('record_id')
+    result.pop('domain', None)
+    return result
+
 def run_dns(args: argparse.Namespace) -> str: # pylint: disable = too-many-branches
     """Run DNS"""
     try:
@@ -160,13 +192,7 @@ def run_dns(args: argparse.Namespace) -> str: # pylint: disable = too-many-branc
             else:
                 records = dns.get_records(domain)
 
-            result = []
-            for record in records:
-                modified_record = record.__dict__
-                modified_record['type'] = modified_record.pop('record_type')
-                modified_record['id'] = modified_record.pop('record_id')
-                modified_record.pop('domain', None)
-                result.append(modified_record)
+            result = [record_output(record) for record in records]
 
         elif command == 'create':
             result = dns.create_record(domain, record)
@@ -192,102 +218,304 @@ def run_dns(args: argparse.Namespace) -> str: # pylint: disable = too-many-branc
 
     return json.dumps(result)
 
-def run_dns_bulk(args: argparse.Namespace) -> None: # pylint: disable = [too-many-locals, too-many-branches, too-many-statements]
+# Functions making each planned change, with the action name used in output
+OPERATIONS = {'create': (create_record, 'CREATE'),
+              'edit': (edit_record, 'EDIT'),
+              'delete': (delete_record, 'DELETE')}
+
+def apply_change(domain, change: tuple) -> tuple:
+    """Make a single planned change, returning (action, success, result, record)"""
+    action, record = change
+    if action not in OPERATIONS:
+        # Unchanged and ignored records need no API call
+        return action, True, None, record
+    success, result, record = OPERATIONS[action][0](domain, record)
+    return action, success, result, record
+
+def apply_phases(domain, phases: list, results: 'BulkResults', concurrency: int = 1) -> None:
+    """Make planned changes phase by phase, adding each outcome to results"""
+    for phase in phases:
+        for outcome in concurrent_map(partial(apply_change, domain), phase, concurrency):
+            results.add(*outcome)
+
+
+class BulkResults():
+    '''Results of a bulk operation written to an output file
+
+    Output files ending in .jsonl receive one JSON line per record as soon
+    as its operation completes, so memory use stays flat and the log of
+    completed operations survives an interrupted run. Other output files
+    receive a single JSON document grouping results by action once all
+    operations have completed.
+    '''
+
+    def __init__(self, output_file: str):
+        self.output_file = output_file
+        self.incremental = output_file.endswith('.jsonl')
+        self.results = {'CREATED': {'SUCCESS': [], 'FAILURE': []},
+                        'EDITED': {'SUCCESS': [], 'FAILURE': []},
+                        'DELETED': {'SUCCESS': [], 'FAILURE': []},
+                        'IGNORED': [],
+                        'UNCHANGED': []}
+        self._file = open(output_file, 'w', # pylint: disable = consider-using-with
+                          encoding='utf8') if self.incremental else None
+
+    def __enter__(self) -> 'BulkResults':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def add(self, action: str, success: bool, result, record: dict) -> None:
+        """Report and record the outcome of a planned change"""
+        key = action.upper()
+        if action in OPERATIONS:
+            name = OPERATIONS[action][1]
+            key = COMPLETED[name]
+            if success:
+                print(f'{Fore.GREEN}{key} record:{record}{Style.RESET_ALL}')
+            else:
+                print(f'{Back.RED}{Fore.YELLOW}FAILED to {name} record:{record}')
+        elif action == 'ignored':
+            print(f'{Fore.BLUE}{Style.DIM}Adding record to IGNORE list:{record}')
+        if self.incremental:
+            line = {'action': key, 'record': record}
+            if action in OPERATIONS:
+                line.update({'status': 'SUCCESS' if success else 'FAILURE', 'result': result})
+            self._file.write(json.dumps(line) + '\n')
+            self._file.flush()
+        elif action in OPERATIONS:
+            self.results[key]['SUCCESS' if success else 'FAILURE'].append({'result': result,
+                                                                           'record': record})
+        else:
+            self.results[key].append(record)
+
+    def close(self) -> None:
+        """Write grouped results, or close the incremental log"""
+        if self.incremental:
+            if not self._file.closed:
+                self._file.close()
+        else:
+            with open(self.output_file, 'w', encoding='utf8') as file:
+                json.dump(self.results, file)
+        print(f'{Fore.GREEN}{Style.BRIGHT}Detailed results written to {self.output_file}')
+
+
+def read_records(input_file: str, domain: str = None) -> Iterator[dict]:
+    """Lazily read user provided records from file
+
+    The file may hold a JSON array of records, which is decoded incrementally,
+    one JSON record per line (JSON lines), or a BIND zone file for domain.
+    Zone files are recognised by not starting with [ or {.
+    """
+    print(f'{Fore.BLUE}{Style.DIM}Loading updated records from file')
+    with open(input_file, 'rb') as file:
+        head = file.read(65536)
+        start = head.lstrip()[:1]
+        if start == b'[':
+            items = iter_json_items(chain([head], iter(lambda: file.read(65536), b'')), ())
+            for index, record in enumerate(items):
+                if not isinstance(record, dict):
+                    raise ValueError(f'Invalid record at index {index} of {input_file}: '
+                                     'expected a JSON object')
+                yield record
+            return
+        file.seek(0)
+        if start not in (b'{', b''):
+            if domain is None:
+                raise ValueError(f'{input_file} is not JSON and no zone file domain was given')
+            yield from parse_zone((line.decode('utf8') for line in file), domain)
+            return
+        for number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                raise ValueError(f'Invalid record on line {number} of {input_file}: {error}') \
+                    from error
+            if not isinstance(record, dict):
+                raise ValueError(f'Invalid record on line {number} of {input_file}: '
+                                 'expected a JSON object')
+            yield record
+
+def run_dns_bulk(args: argparse.Namespace) -> str:
     """Run DNS Bulk
     flush: Delete ALL existing records and load records from provided file
     merge: Update existing records and add new records if they do not yet exist.
         Records not specified in the file will remain unchanged. Existing records
-        must include the ID
+        are matched by ID, or by name, type and content when no ID is given
     add: Add all records in the provided file
-    """
-    domain: str = args.domain
-    input_file: str = args.input
-    output_file: str = args.output
-    mode: str = args.mode
-    created: dict = {'SUCCESS': [], 'FAILURE': []}
-    edited: dict = {'SUCCESS': [], 'FAILURE': []}
-    deleted: dict = {'SUCCESS': [], 'FAILURE': []}
-    ignored: list = []
-    include_ns: bool = args.incns
+    replace: Make the zone match the provided file, editing records in place
+        where possible and only creating and deleting what has changed
 
-    print(f'{Fore.BLUE}{Style.DIM}Loading updated records from file')
-    with open(input_file, 'r', encoding='utf8') as file:
-        user_provided_records = json.load(file)
-
-    run_dns_args = argparse.Namespace(domain=domain,
-                                      command='get',
-                                      id='', name='',
-                                      type='',
-                                      content='',
-                                      ttl='',
-                                      priority='',
-                                      notes='')
+    Records are read from the input file as they are processed, see read_records
+    and BulkResults for the supported file formats.
+    """
+    print(f'{Fore.BLUE}{Style.DIM}Collecting existing records')
+    try:
+        existing = dns.get_records(args.domain)
+    except (ApiError, ApiFailure) as error:
+        return f'{Back.RED}{Fore.YELLOW}API Error -> {error.message}'
+    records = read_records(args.input, args.domain)
+    # NS records are excluded from all operations unless explicitly included
+    if not args.incns:
+        existing = without_ns(existing, args.domain)
+        records = without_ns(records, args.domain)
+    phases = plan_phases(existing, records, args.domain, args.mode)
+    with BulkResults(args.output) as results:
+        try:
+            apply_phases(args.domain, phases, results, args.concurrency)
+        except ValueError as error:
+            return f'{Back.RED}{Fore.YELLOW}{error}'
+    return None
 
+def run_dns_plan(args: argparse.Namespace) -> str:
+    """Run DNS Plan: write the changes a bulk operation would make to file"""
     print(f'{Fore.BLUE}{Style.DIM}Collecting existing records')
-    existing_records: dict = json.loads(run_dns(run_dns_args))
-
-    # Remove NS records from all operations unless explicitly included
-    if not include_ns:
-        existing_records = [record for record in existing_records if record['type'] != 'NS']
-        user_provided_records = [record for record in user_provided_records if record['type'] != 'NS'] #pylint: disable=line-too-long
-
-    if mode == 'flush':
-        deleted = delete_records(domain, existing_records)
-        created = create_records(domain, user_provided_records)
-
-    if mode == 'add':
-        created = create_records(domain, user_provided_records)
-
-    if mode == 'merge': # pylint: disable = too-many-nested-blocks
-        # This is a somewhat complex collection of loop and if's
-        # The goal is to make the cli tolerant to variations in user input
-        # that could be expected due to outputs from other commands
-        to_edit = []
-        to_create = []
-        for user_record in user_provided_records:
-            # If the id key is present then it should be cheked for editing
-            # if not, it should be created (fall through to first else)
-            if user_record.get('id') is not None:
-                # If the id key is present, but has no value, then assume
-                # it should be created as well (fall through to nested else)
-                if len(user_record['id']) != 0:
-                    for exist_record in existing_records:
-                        # If the Id values match between an existing and
-                        # and user provided record then we need to edit it
-                        if exist_record['id'] == user_record['id']:
-                            # Make sure the records are different or else
-                            # the API will return an error that it could
-                            # not edit the record
-                            if exist_record != user_record:
-                                print(Fore.BLUE + Style.DIM
-                                      + f'Adding record to EDIT list:{user_record}')
-                                to_edit.append(user_record)
-
-                else:
-                    print(Fore.BLUE + Style.DIM
-                          + f'Adding record with EMPTY "id" field to CREATE list:{user_record}')
-                    to_create.append(user_record)
-            else:
-                print(Fore.BLUE + Style.DIM
-                      + f'Adding record with NO "id" field to CREATE list:{user_record}')
-                to_create.append(user_record)
-        # If after the above comparison if the record does not appear in
-        # to_create or to_edit, then the ID must have been provided and
-        # it must be incorrect
-        for user_record in user_provided_records:
-            if user_record not in to_create and user_record not in to_edit:
-                print(f'{Fore.BLUE}{Style.DIM}Adding record to IGNORE list:{user_record}')
-                ignored.append(user_record)
-        # create and edit records as required
-        created = create_records(domain, to_create)
-        edited = edit_records(domain, to_edit)
-
-    # Format results to be written to file
-    result = {'CREATED': created, 'EDITED': edited, 'DELETED': deleted, 'IGNORED': ignored}
-
-    with open(output_file, 'w', encoding='utf8') as file:
-        json.dump(result, file)
-    print(f'{Fore.GREEN}{Style.BRIGHT}Detailed results written to {output_file}')
+    try:
+        plan = make_plan(args.domain, read_records(args.input, args.domain), args.mode, args.incns)
+    except (ApiError, ApiFailure) as error:
+        return f'{Back.RED}{Fore.YELLOW}API Error -> {error.message}'
+    except ValueError as error:
+        return f'{Back.RED}{Fore.YELLOW}{error}'
+    plan.save(args.output)
+    summary = ', '.join(f'{count} {action}' for action, count in plan.changes.summary().items())
+    print(f'{Fore.GREEN}{Style.BRIGHT}Plan written to {args.output}')
+    return (f'{summary}\n{plan.calls} API calls, estimated '
+            f'{plan.estimate(concurrency=args.concurrency):.1f} seconds '
+            f'at concurrency {args.concurrency}')
+
+def run_dns_export(args: argparse.Namespace) -> str:
+    """Run DNS Export: write all records of the domain to a BIND zone file"""
+    print(f'{Fore.BLUE}{Style.DIM}Collecting existing records')
+    try:
+        records = dns.get_records(args.domain)
+    except (ApiError, ApiFailure) as error:
+        return f'{Back.RED}{Fore.YELLOW}API Error -> {error.message}'
+    if not args.incns:
+        records = without_ns(records, args.domain)
+    count = write_zone(records, args.domain, args.output)
+    return f'{Fore.GREEN}{Style.BRIGHT}{count} records written to {args.output}'
+
+def run_dns_watch(args: argparse.Namespace) -> str:
+    """Run DNS Watch: print records added, changed and removed as JSON lines
+
+    Polls back off while the zone is quiet and continue until interrupted,
+    or until -count polls have been made. Failed polls are reported and
+    retried at the next interval, except for API key and access errors.
+    """
+    watcher = ZoneWatcher(args.domain, args.interval, args.max_interval)
+    def report_error(error):
+        print(f'{Back.RED}{Fore.YELLOW}Watch poll failed -> {getattr(error, "message", error)}',
+              file=sys.stderr)
+    print(f'{Fore.BLUE}{Style.DIM}Watching {args.domain}', file=sys.stderr)
+    try:
+        for event in watcher.watch(args.count, on_error=report_error):
+            print(json.dumps(event.to_dict()), flush=True)
+    except (ApiError, ApiFailure) as error:
+        return f'{Back.RED}{Fore.YELLOW}API Error -> {error.message}'
+    except KeyboardInterrupt:
+        pass
+    return None
+
+def run_dns_apply(args: argparse.Namespace) -> str:
+    """Run DNS Apply: apply a plan written by plan if the zone is unchanged"""
+    try:
+        plan = Plan.load(args.plan)
+    except (OSError, ValueError, KeyError) as error:
+        return f'{Back.RED}{Fore.YELLOW}Invalid plan file -> {error}'
+    if plan.domain != args.domain:
+        return f'{Fore.RED}Plan is for {plan.domain}, not {args.domain}'
+    print(f'{Fore.BLUE}{Style.DIM}Checking existing records')
+    try:
+        plan.check(dns.get_records(args.domain))
+    except StalePlanError as error:
+        return f'{Back.RED}{Fore.YELLOW}{error.message}. Run plan again'
+    except (ApiError, ApiFailure) as error:
+        return f'{Back.RED}{Fore.YELLOW}API Error -> {error.message}'
+    with BulkResults(args.output) as results:
+        apply_phases(args.domain, plan.phases(), results, args.concurrency)
+    return None
+
+def run_ddns(args: argparse.Namespace) -> str:
+    """Run DDNS: keep A and AAAA records pointing at the addresses of this host
+
+    Each record created or edited is printed as a JSON line. Checks continue
+    on an interval until interrupted unless -once is set. Errors are
+    reported and the check retried at the next interval.
+    """
+    ddns = DynamicDns(args.domain, args.name or ('',), not args.v6, not args.v4,
+                      args.ttl, args.state)
+    def report_error(error):
+        print(f'{Back.RED}{Fore.YELLOW}DDNS check failed -> {getattr(error, "message", error)}',
+              file=sys.stderr)
+    try:
+        for results in ddns.run(args.interval, 1 if args.once else None,
+                                None if args.once else report_error):
+            for result in results:
+                print(json.dumps({'domain': args.domain, **result}), flush=True)
+    except (ApiError, ApiFailure) as error:
+        return f'{Back.RED}{Fore.YELLOW}API Error -> {error.message}'
+    except KeyboardInterrupt:
+        pass
+    return None
+
+def read_domains(domains_file: str) -> Iterator[str]:
+    """Lazily read domains from file, one per line
+
+    Blank lines and lines starting with # are skipped. A file name of -
+    reads from standard input.
+    """
+    file = sys.stdin if domains_file == '-' \
+        else open(domains_file, 'r', encoding='utf8') # pylint: disable = consider-using-with
+    try:
+        for line in file:
+            domain = line.strip()
+            if domain and not domain.startswith('#'):
+                yield domain
+    finally:
+        if file is not sys.stdin:
+            file.close()
+
+def run_dns_multi(args: argparse.Namespace) -> str:
+    """Run DNS Multi: get the records of many domains as one JSON lines stream
+
+    Each line holds one record tagged with its domain. A domain that cannot
+    be retrieved produces a single line with an error instead, and the
+    remaining domains are still retrieved. Progress is reported on stderr
+    so that stdout can be piped.
+    """
+    try:
+        command: str = args.command
+    except AttributeError:
+        return 'Please choose from get'
+    output = sys.stdout if args.output is None \
+        else open(args.output, 'w', encoding='utf8') # pylint: disable = consider-using-with
+    domains = failures = records = 0
+    try:
+        if command == 'get':
+            for domain, zone, error in load_zones(read_domains(args.domains_file),
+                                                  concurrency=args.concurrency):
+                domains += 1
+                if error is not None:
+                    failures += 1
+                    line = {'domain': domain, 'error': getattr(error, 'message', str(error)),
+                            'http_status': getattr(error, 'http_status', None)}
+                    output.write(json.dumps(line) + '\n')
+                    print(f'{Fore.RED}{domain}: {line["error"]}', file=sys.stderr)
+                    continue
+                for record in zone.filter(record_type=args.type or None):
+                    records += 1
+                    output.write(json.dumps({'domain': domain, **record_output(record)}) + '\n')
+                output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    colour = Fore.YELLOW if failures else Fore.GREEN
+    print(f'{colour}{Style.BRIGHT}{records} records from {domains - failures} of '
+          f'{domains} domains', file=sys.stderr)
+    return None
 
 def main() -> str: # pylint: disable = too-many-statements
     """"Operate pyrkbun from the command line"""
@@ -313,6 +541,8 @@ For API Secret Key set:
 
     pricing_parser = pyrkbun_subparser.add_parser('pricing', help='Retrieve pricing information')
     pricing_parser.set_defaults(func=run_pricing)
+    pricing_parser.add_argument('-refresh', '--refresh', action='store_true',
+                                help='Retrieve from the API instead of the local cache')
 
     ssl_parser = pyrkbun_subparser.add_parser('ssl', help='Retrieve SSL bundle if available')
     ssl_parser.set_defaults(func=run_ssl)
@@ -394,17 +624,98 @@ For API Secret Key set:
                         type=str, choices=SUPPORTED_DNS_RECORD_TYPES)
 
     bulk = dns_subparser.add_parser('bulk', help='Run bulk operations on DNS Service')
-    bulk.set_defaults(func=run_dns_bulk, mode='merge')
-    bulk.add_argument('input', help='File containing JSON formatted DNS records')
+    bulk.set_defaults(func=run_dns_bulk, mode='merge', concurrency=1)
+    bulk.add_argument('input', help='File containing JSON formatted DNS records or a zone file')
     bulk.add_argument('output', help='File to write results of bulk operation')
     bulk.add_argument('-incns', action='store_true', help='Include Name Server Records')
-    bulk.add_argument('-mode', choices={'flush', 'merge', 'add'},
+    bulk.add_argument('-mode', choices={'flush', 'merge', 'add', 'replace'},
                       help='Defaults to merge. '
                     + '"add": Add all records in the provided file. '
                     + '"flush": Delete ALL existing records and load records from provided file. '
                     + '"merge": Update existing records and add new records if they do not yet '
-                    + 'exist. Records not specified in the file will remain unchanged.  '
-                    + 'Existing records must include the record ID.')
+                    + 'exist. Records not specified in the file will remain unchanged. '
+                    + 'Existing records are matched by ID, or by name, type and content. '
+                    + '"replace": Make the zone match the provided file, editing records in '
+                    + 'place where possible. Unchanged records are left untouched.')
+    bulk.add_argument('-concurrency', type=int,
+                      help='Number of API calls to run in parallel. Defaults to 1. '
+                    + 'Calls remain subject to the PYRK_RATE rate limit, and calls '
+                    + 'throttled by the API are retried PYRK_STATUS_RETRIES times '
+                    + '(default 2)')
+
+    plan = dns_subparser.add_parser('plan', help='Write the changes a bulk operation would make '
+                                    + 'to a plan file for review, without making them')
+    plan.set_defaults(func=run_dns_plan, mode='merge', concurrency=1)
+    plan.add_argument('input', help='File containing JSON formatted DNS records or a zone file')
+    plan.add_argument('output', help='File to write the plan to')
+    plan.add_argument('-incns', action='store_true', help='Include Name Server Records')
+    plan.add_argument('-mode', choices={'flush', 'merge', 'add', 'replace'},
+                      help='Bulk mode to plan. Defaults to merge')
+    plan.add_argument('-concurrency', type=int,
+                      help='Concurrency the time estimate assumes. Defaults to 1')
+
+    export = dns_subparser.add_parser('export', help='Write all DNS records to a BIND zone file. '
+                                      + 'Zone files can be used as bulk and plan input')
+    export.set_defaults(func=run_dns_export)
+    export.add_argument('output', help='Zone file to write')
+    export.add_argument('-incns', action='store_true', help='Include Name Server Records')
+
+    watch = dns_subparser.add_parser('watch', help='Poll for records added, changed or removed '
+                                     + 'and print them as JSON lines')
+    watch.set_defaults(func=run_dns_watch, interval=60.0, max_interval=900.0, count=None)
+    watch.add_argument('-interval', type=float,
+                       help='Seconds between polls while the zone is changing. Defaults to 60')
+    watch.add_argument('-max-interval', '--max-interval', type=float, dest='max_interval',
+                       help='Longest interval polls back off to while the zone is quiet. '
+                     + 'Defaults to 900')
+    watch.add_argument('-count', type=int,
+                       help='Number of polls to make. Defaults to polling until interrupted')
+
+    apply = dns_subparser.add_parser('apply', help='Apply a plan file. Fails without making '
+                                     + 'changes if the zone has changed since planning')
+    apply.set_defaults(func=run_dns_apply, concurrency=1)
+    apply.add_argument('plan', help='Plan file written by plan')
+    apply.add_argument('output', help='File to write results of the operation')
+    apply.add_argument('-concurrency', type=int,
+                       help='Number of API calls to run in parallel. Defaults to 1. '
+                     + 'Calls remain subject to the PYRK_RATE rate limit')
+
+    ddns_parser = pyrkbun_subparser.add_parser('ddns', help='Keep A and AAAA records pointing '
+                                               + 'at the IP addresses of this host')
+    ddns_parser.set_defaults(func=run_ddns, interval=300.0, ttl='600')
+    ddns_parser.add_argument('domain', help='Target domain')
+    ddns_parser.add_argument('-name', action='append',
+                             help='DNS record name to update, may be repeated. '
+                           + 'Defaults to the domain itself')
+    ddns_family = ddns_parser.add_mutually_exclusive_group()
+    ddns_family.add_argument('-v4', action='store_true', help='Update A records only')
+    ddns_family.add_argument('-v6', action='store_true', help='Update AAAA records only')
+    ddns_parser.add_argument('-ttl', help='DNS record ttl', type=str)
+    ddns_parser.add_argument('-interval', type=float,
+                             help='Seconds between checks. Defaults to 300')
+    ddns_parser.add_argument('-once', '--once', action='store_true',
+                             help='Check once and exit, e.g. when run from cron')
+    ddns_parser.add_argument('-state', '--state',
+                             help='State file holding the last addresses written. '
+                           + 'Defaults to ddns-<domain>.json in PYRK_CACHE_DIR')
+
+    multi_parser = pyrkbun_subparser.add_parser('dns-multi',
+                                                help='Operate DNS records of many domains')
+    multi_parser.set_defaults(func=run_dns_multi)
+    multi_subparser = multi_parser.add_subparsers()
+
+    multi_get = multi_subparser.add_parser('get', help='Get the DNS records of many domains as '
+                                           + 'JSON lines tagged with the domain')
+    multi_get.set_defaults(command='get', output=None, type='', concurrency=4)
+    multi_get.add_argument('-domains-file', '--domains-file', required=True,
+                           help='File listing one domain per line, or - for stdin')
+    multi_get.add_argument('-output', '--output',
+                           help='File to write records to. Defaults to stdout')
+    multi_get.add_argument('-type', help='DNS record type',
+                           type=str, choices=SUPPORTED_DNS_RECORD_TYPES)
+    multi_get.add_argument('-concurrency', type=int,
+                           help='Number of domains retrieved in parallel. Defaults to 4. '
+                         + 'Calls remain subject to the PYRK_RATE rate limit')
 
     args = parser.parse_args()
 
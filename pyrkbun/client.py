@@ -0,0 +1,653 @@
+"""Porkbun API client
+
+A PorkbunClient holds its own credentials, endpoint, timeouts, connection
+pool, rate limiter and retry policies, allowing several independently tuned
+clients to be used side by side in one process. The module level pyrkbun
+functions and classes use a default client configured from the environment.
+
+Example:
+>>> import pyrkbun
+>>> client = pyrkbun.PorkbunClient(api_key='pk1_abc', secret='sk1_abc',
+...                                timeout=5, rate_limit=2)
+>>> client.dns.get_records('example.com', 'A')
+[Dns(domain='example.com', name='www', record_type='A', ... ]
+>>> client.ping()
+{'status': 'SUCCESS', 'yourIp': '198.51.100.45'}
+"""
+import time
+import asyncio
+import weakref
+import threading
+from typing import Iterator
+import httpx
+
+from .const import ApiError, ApiFailure, VALID_HTTP_RESPONSE
+from .const import API_KEY, API_SECRET_KEY, BASE_URL, BASE_URL_V4, RATE_LIMIT, RATE_BURST
+from .const import SIMULATOR, RETRIES, TIMEOUT, HTTP2, POOL_CONNECTIONS, POOL_KEEPALIVE
+from .const import KEEPALIVE_EXPIRY
+from .ratelimit import RateLimiter
+from .metrics import RequestEvent
+from .cache import RecordCache
+from .stream import iter_json_items
+from .retry import THROTTLE_HTTP_RESPONSE, RetryPolicy, ENDPOINT_CLASSES, policy_for
+from .retry import retry_after, backoff_delay, reconcile_path, reconcile_match, endpoint
+from .retry import AMBIGUOUS_HTTP_RESPONSE
+
+# Optional transports replacing the network for every client that was not
+# given its own, for example those of a pyrkbun.simulator.PorkbunSimulator
+_TRANSPORTS: dict = {'sync': None, 'async': None}
+# All clients, so their connections can be reset when the transports change
+_CLIENTS: 'weakref.WeakSet[PorkbunClient]' = weakref.WeakSet()
+
+def set_transport(transport: httpx.BaseTransport = None,
+                  async_transport: httpx.AsyncBaseTransport = None) -> None:
+    """Route API calls through the given transports instead of the network
+
+    Applies to all clients not created with their own transport. Pooled
+    connections are closed so subsequent calls use the new transports.
+    Call with no arguments to restore network transports.
+
+    Args:
+    transport (optional): Transport used by blocking API calls
+    async_transport (optional): Transport used by asyncio API calls
+    """
+    _TRANSPORTS.update({'sync': transport, 'async': async_transport})
+    for client in list(_CLIENTS):
+        client.close()
+
+def get_transport() -> tuple:
+    """Return the (sync, async) transports overriding the network, if any"""
+    if SIMULATOR and _TRANSPORTS['sync'] is None and _TRANSPORTS['async'] is None:
+        # pylint: disable = import-outside-toplevel
+        from .simulator import default_simulator
+        simulator = default_simulator()
+        _TRANSPORTS.update({'sync': simulator.transport(),
+                            'async': simulator.async_transport()})
+    return _TRANSPORTS['sync'], _TRANSPORTS['async']
+
+def parse_response(response: httpx.Response) -> dict:
+    """Decode API response and raise on API errors
+
+    Rasies:
+    ApiError(): If the API returns a non-200 status code
+    ApiFailure(): If JSON decoding of the returned data fails
+    """
+    try:
+        result: dict = response.json()
+    except ValueError as error:
+        print(response.status_code)
+        print(response.content)
+        raise ApiFailure(response.status_code, response.content) from error
+
+    # pylint: disable=no-else-return
+    if response.status_code in VALID_HTTP_RESPONSE:
+        return result
+    else:
+        result.update({'http_status': response.status_code})
+        raise ApiError(**result)
+
+def response_error(response: httpx.Response) -> Exception:
+    """Return the ApiError or ApiFailure raised by parse_response for a response"""
+    try:
+        parse_response(response)
+    except (ApiError, ApiFailure) as error:
+        return error
+    return ApiFailure(response.status_code, response.text)
+
+
+class PorkbunClient(): # pylint: disable = too-many-instance-attributes
+    '''Porkbun API client with its own configuration, connection pool and rate limiter
+
+    All arguments are optional and default to the values configured from
+    the PYRK_* environment variables.
+
+    Args:
+    api_key: Porkbun API Key
+    secret: Porkbun API Secret Key
+    base_url: API base URL
+    timeout: Request timeout in seconds, or an httpx.Timeout
+    limits: Connection pool limits as an httpx.Limits
+    transport: httpx transport for blocking calls. Replaces the network
+        connection pool, e.g. with a simulator transport
+    rate_limit: RateLimiter instance (which may be shared with other
+        clients) or a number of requests per second. Defaults to a new
+        limiter configured from PYRK_RATE and PYRK_BURST
+    retries: Transport retries on connection failures
+    http2: Enable HTTP/2
+    async_transport: httpx transport for asyncio calls
+    base_url_v4: API base URL used when IPv4 is forced
+    policies: Retry policies keyed by endpoint class ('read', 'write' and
+        'create'). Defaults to the shared pyrkbun.retry.RETRY_POLICIES
+    hooks: Lists of callables keyed by 'request' and 'response', called
+        with a pyrkbun.metrics.RequestEvent for every request attempt.
+        Request hooks run before sending, response hooks once the response
+        has been decoded or a transport error raised
+    cache: pyrkbun.cache.RecordCache answering repeated DNS retrievals.
+        Defaults to no caching
+
+    Usage:
+    Record operations are available through client.dns (blocking) and
+    client.async_dns (coroutines), which behave exactly like pyrkbun.dns
+    and pyrkbun.aio.AsyncDns. The client may be used as a context manager
+    to close its connections on exit.
+    '''
+
+    # pylint: disable = too-many-arguments
+    def __init__(self,
+                 api_key: str = API_KEY,
+                 secret: str = API_SECRET_KEY,
+                 base_url: str = BASE_URL,
+                 timeout: float = TIMEOUT,
+                 limits: httpx.Limits = None,
+                 transport: httpx.BaseTransport = None,
+                 rate_limit: RateLimiter = None,
+                 retries: int = RETRIES,
+                 http2: bool = HTTP2,
+                 async_transport: httpx.AsyncBaseTransport = None,
+                 base_url_v4: str = BASE_URL_V4,
+                 policies: dict = None,
+                 hooks: dict = None,
+                 cache: RecordCache = None):
+        self.api_key = api_key
+        self.secret = secret
+        self.base_url = base_url
+        self.base_url_v4 = base_url_v4
+        self.timeout = timeout
+        self.limits = limits if limits is not None \
+            else httpx.Limits(max_connections=POOL_CONNECTIONS,
+                              max_keepalive_connections=POOL_KEEPALIVE,
+                              keepalive_expiry=KEEPALIVE_EXPIRY)
+        self.transport = transport
+        self.async_transport = async_transport
+        self.retries = retries
+        self.http2 = bool(http2)
+        if isinstance(rate_limit, RateLimiter):
+            self.limiter = rate_limit
+        elif rate_limit is None:
+            self.limiter = RateLimiter.from_interval(RATE_LIMIT, RATE_BURST)
+        else:
+            self.limiter = RateLimiter(rate_limit)
+        self.policies = policies
+        self.hooks = {'request': [], 'response': []} if hooks is None else hooks
+        self.hooks.setdefault('request', [])
+        self.hooks.setdefault('response', [])
+        self.cache = cache
+        self._http_client: httpx.Client = None
+        self._async_http_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._bound: dict = {}
+        _CLIENTS.add(self)
+
+    def __repr__(self) -> str:
+        return f'PorkbunClient(base_url={self.base_url!r}, limiter={self.limiter!r})'
+
+    def __enter__(self) -> 'PorkbunClient':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    async def __aenter__(self) -> 'PorkbunClient':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    def http_client(self) -> httpx.Client:
+        """Return the pooled http client, creating it on first use"""
+        client = self._http_client
+        if client is not None and not client.is_closed:
+            return client
+        with self._lock:
+            if self._http_client is None or self._http_client.is_closed:
+                transport = self.transport or get_transport()[0] \
+                    or httpx.HTTPTransport(http2=self.http2, limits=self.limits,
+                                           retries=self.retries)
+                headers = {'content-type': 'application/json'}
+                self._http_client = httpx.Client(headers=headers, transport=transport,
+                                                 timeout=self.timeout)
+            return self._http_client
+
+    def async_http_client(self) -> httpx.AsyncClient:
+        """Return the pooled async http client for the running event loop
+
+        An httpx.AsyncClient is bound to the event loop it is first used on,
+        so a pooled client is held per event loop.
+        """
+        loop = asyncio.get_running_loop()
+        client = self._async_http_clients.get(loop)
+        if client is None or client.is_closed:
+            transport = self.async_transport or get_transport()[1] \
+                or httpx.AsyncHTTPTransport(http2=self.http2, limits=self.limits,
+                                            retries=self.retries)
+            headers = {'content-type': 'application/json'}
+            client = httpx.AsyncClient(headers=headers, transport=transport,
+                                       timeout=self.timeout)
+            self._async_http_clients[loop] = client
+        return client
+
+    def close(self) -> None:
+        """Close pooled connections, they are reopened by the next API call
+
+        Async clients cannot be closed outside their event loop and are
+        released instead, use aclose() from within the loop to close them.
+        """
+        with self._lock:
+            client, self._http_client = self._http_client, None
+            self._async_http_clients = weakref.WeakKeyDictionary()
+        if client is not None:
+            client.close()
+
+    async def aclose(self) -> None:
+        """Close pooled connections including those of the running event loop"""
+        client = self._async_http_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+        self.close()
+
+    def policy(self, path: str) -> RetryPolicy:
+        """Return the retry policy applied to a request path"""
+        if self.policies is None:
+            return policy_for(path)
+        return self.policies[ENDPOINT_CLASSES.get(endpoint(path), 'write')]
+
+    def _auth(self, payload: dict) -> None:
+        """Update request payload with API auth data"""
+        payload.update({'secretapikey': self.secret, 'apikey': self.api_key})
+
+    @staticmethod
+    def _strip_auth(payload: dict) -> None:
+        """Remove API auth data from request payload
+
+        Auth data added to payloads is removed to prevent accidental exposure
+        and allow reuse of dicts provided to create and update functions
+        """
+        payload.pop('apikey', None)
+        payload.pop('secretapikey', None)
+
+    # pylint: disable = too-many-arguments
+    def post(self,
+             path: str,
+             payload: dict = None,
+             auth: bool = True,
+             force_v4: bool = False,
+             policy: RetryPolicy = None,
+             limiter: RateLimiter = None,
+             base_url: str = None) -> dict:
+        """Format request and post to API endpoint
+
+        See pyrkbun.util.api_post for details of arguments and behaviour.
+        DNS retrievals are answered from the client cache when one is set.
+
+        Args:
+        base_url (optional): Overrides the client base URL for this request
+        """
+        cache = self.cache
+        if cache is None:
+            return self._post(path, payload, auth, force_v4, policy, limiter, base_url)
+        key = cache.key(path)
+        if key is None:
+            domain = cache.domain(path)
+            try:
+                return self._post(path, payload, auth, force_v4, policy, limiter, base_url)
+            finally:
+                if domain is not None:
+                    cache.invalidate(domain)
+        result = cache.lookup(key)
+        if result is None:
+            generation = cache.generation(key[0])
+            result = self._post(path, payload, auth, force_v4, policy, limiter, base_url)
+            cache.store(key, result, generation)
+        return result
+
+    def _post(self,
+              path: str,
+              payload: dict,
+              auth: bool,
+              force_v4: bool,
+              policy: RetryPolicy,
+              limiter: RateLimiter,
+              base_url: str) -> dict:
+        """Send a request to the API, applying rate limiting and retries"""
+        payload = {} if payload is None else payload
+        url = f'{base_url or (self.base_url_v4 if force_v4 else self.base_url)}{path}'
+        if auth:
+            self._auth(payload)
+        try:
+            client = self.http_client()
+            limiter = self.limiter if limiter is None else limiter
+            policy = self.policy(path) if policy is None else policy
+            attempt = 0
+            while True:
+                queued = limiter.acquire()
+                event = self._request_event(path, attempt, queued)
+                extensions = None if event is None else {'trace': event.trace}
+                try:
+                    response = client.post(url, json=payload, extensions=extensions)
+                except httpx.TransportError as error:
+                    if event is not None:
+                        self._emit('response', event.complete(error=error))
+                    if not isinstance(error, policy.errors):
+                        if not policy.reconcile:
+                            raise
+                        # The request may have been processed, look for the
+                        # created record before considering a resend
+                        result = self._reconcile_create(path, payload, limiter, base_url,
+                                                        error)
+                        if result is not None:
+                            return result
+                    if attempt >= policy.retries:
+                        raise
+                    time.sleep(backoff_delay(attempt))
+                    attempt += 1
+                    continue
+                delay = retry_after(response)
+                if response.status_code in THROTTLE_HTTP_RESPONSE:
+                    limiter.throttle(delay)
+                else:
+                    limiter.recover()
+                if policy.reconcile and response.status_code in AMBIGUOUS_HTTP_RESPONSE:
+                    # A server error may be returned after the record was created
+                    if event is not None:
+                        self._emit('response', event.complete(response))
+                    error = response_error(response)
+                    result = self._reconcile_create(path, payload, limiter, base_url, error)
+                    if result is not None:
+                        return result
+                    if attempt >= policy.retries:
+                        raise error
+                    time.sleep(backoff_delay(attempt, delay))
+                    attempt += 1
+                    continue
+                if response.status_code not in policy.statuses or attempt >= policy.retries:
+                    break
+                if event is not None:
+                    self._emit('response', event.complete(response))
+                time.sleep(backoff_delay(attempt, delay))
+                attempt += 1
+        finally:
+            self._strip_auth(payload)
+        return self._parse(response, event)
+
+    # pylint: disable = too-many-arguments, too-many-locals
+    def iter_items(self,
+                   path: str,
+                   items: tuple,
+                   payload: dict = None,
+                   auth: bool = True,
+                   force_v4: bool = False,
+                   policy: RetryPolicy = None,
+                   limiter: RateLimiter = None,
+                   base_url: str = None) -> Iterator:
+        """Post to API endpoint and yield the items of a response container
+
+        The response is decoded incrementally as it is received (see
+        pyrkbun.stream), so only one item is held in memory at a time.
+        Requests are rate limited and retried like post() up to the point
+        the response starts streaming. The record cache is not used.
+
+        Args:
+        path: Section of API path that extends base URL
+        items: Keys leading to the container in the response, e.g.
+            ('records',) for DNS retrievals
+        See post() for the remaining arguments
+
+        Yields:
+        The values of an array container or (key, value) pairs of an object
+        """
+        payload = {} if payload is None else payload
+        url = f'{base_url or (self.base_url_v4 if force_v4 else self.base_url)}{path}'
+        client = self.http_client()
+        if auth:
+            self._auth(payload)
+        try:
+            # The request body is encoded here, so auth data can be removed
+            # before any response is consumed
+            request = client.build_request('POST', url, json=payload)
+        finally:
+            self._strip_auth(payload)
+        limiter = self.limiter if limiter is None else limiter
+        policy = self.policy(path) if policy is None else policy
+        attempt = 0
+        while True:
+            queued = limiter.acquire()
+            event = self._request_event(path, attempt, queued)
+            if event is not None:
+                request.extensions['trace'] = event.trace
+            try:
+                response = client.send(request, stream=True)
+            except httpx.TransportError as error:
+                if event is not None:
+                    self._emit('response', event.complete(error=error))
+                if not isinstance(error, policy.errors) or attempt >= policy.retries:
+                    raise
+                time.sleep(backoff_delay(attempt))
+                attempt += 1
+                continue
+            delay = retry_after(response)
+            if response.status_code in THROTTLE_HTTP_RESPONSE:
+                limiter.throttle(delay)
+            else:
+                limiter.recover()
+            if response.status_code not in policy.statuses or attempt >= policy.retries:
+                break
+            response.close()
+            if event is not None:
+                self._emit('response', event.complete(response))
+            time.sleep(backoff_delay(attempt, delay))
+            attempt += 1
+        try:
+            if response.status_code not in VALID_HTTP_RESPONSE:
+                response.read()
+                self._parse(response, event)
+            received = 0
+            def chunks():
+                nonlocal received
+                for chunk in response.iter_bytes():
+                    received += len(chunk)
+                    yield chunk
+            try:
+                yield from iter_json_items(chunks(), items)
+            except ValueError as error:
+                raise ApiFailure(response.status_code, str(error)) from error
+            if event is not None:
+                event.bytes_received = received
+                self._emit('response', event.complete(response))
+        finally:
+            response.close()
+
+    def _request_event(self, path: str, attempt: int, queued: float) -> RequestEvent:
+        """Create the event of a request attempt and call request hooks
+
+        Returns None when no hooks are registered, so uninstrumented clients
+        pay nothing for instrumentation.
+        """
+        if not (self.hooks['request'] or self.hooks['response']):
+            return None
+        event = RequestEvent(path, attempt, queued)
+        self._emit('request', event)
+        return event
+
+    def _emit(self, hook: str, event: RequestEvent) -> None:
+        """Call the registered hooks of a type with a request event"""
+        for func in self.hooks[hook]:
+            func(event)
+
+    def _parse(self, response: httpx.Response, event: RequestEvent) -> dict:
+        """Decode the final response, timing the decode for response hooks"""
+        if event is None:
+            return parse_response(response)
+        started = time.perf_counter()
+        try:
+            return parse_response(response)
+        finally:
+            event.decode = time.perf_counter() - started
+            self._emit('response', event.complete(response))
+
+    def _reconcile_create(self,
+                          path: str,
+                          payload: dict,
+                          limiter: RateLimiter,
+                          base_url: str,
+                          error: Exception) -> dict:
+        """Look up the record of a create request that failed ambiguously
+
+        Returns a response equivalent to a successful create if the record was
+        found, or None if it does not exist. The original error is raised if
+        the lookup itself fails.
+        """
+        try:
+            # The cache is bypassed as the create has not invalidated it yet
+            response = self._post(reconcile_path(path, payload), None, True, False, None,
+                                  limiter, base_url)
+        except (ApiError, ApiFailure, httpx.TransportError):
+            raise error from None
+        return reconcile_match(path, payload, response)
+
+    # pylint: disable = too-many-arguments
+    async def apost(self,
+                    path: str,
+                    payload: dict = None,
+                    auth: bool = True,
+                    force_v4: bool = False,
+                    policy: RetryPolicy = None,
+                    limiter: RateLimiter = None,
+                    base_url: str = None) -> dict:
+        """Format request and post to API endpoint without blocking
+
+        Async equivalent of post()
+        """
+        cache = self.cache
+        if cache is None:
+            return await self._apost(path, payload, auth, force_v4, policy, limiter, base_url)
+        key = cache.key(path)
+        if key is None:
+            domain = cache.domain(path)
+            try:
+                return await self._apost(path, payload, auth, force_v4, policy, limiter,
+                                         base_url)
+            finally:
+                if domain is not None:
+                    cache.invalidate(domain)
+        result = cache.lookup(key)
+        if result is None:
+            generation = cache.generation(key[0])
+            result = await self._apost(path, payload, auth, force_v4, policy, limiter, base_url)
+            cache.store(key, result, generation)
+        return result
+
+    async def _apost(self,
+                     path: str,
+                     payload: dict,
+                     auth: bool,
+                     force_v4: bool,
+                     policy: RetryPolicy,
+                     limiter: RateLimiter,
+                     base_url: str) -> dict:
+        """Async equivalent of _post()"""
+        payload = {} if payload is None else payload
+        url = f'{base_url or (self.base_url_v4 if force_v4 else self.base_url)}{path}'
+        if auth:
+            self._auth(payload)
+        try:
+            client = self.async_http_client()
+            limiter = self.limiter if limiter is None else limiter
+            policy = self.policy(path) if policy is None else policy
+            attempt = 0
+            while True:
+                queued = await limiter.acquire_async()
+                event = self._request_event(path, attempt, queued)
+                extensions = None if event is None else {'trace': event.atrace}
+                try:
+                    response = await client.post(url, json=payload, extensions=extensions)
+                except httpx.TransportError as error:
+                    if event is not None:
+                        self._emit('response', event.complete(error=error))
+                    if not isinstance(error, policy.errors):
+                        if not policy.reconcile:
+                            raise
+                        result = await self._areconcile_create(path, payload, limiter,
+                                                               base_url, error)
+                        if result is not None:
+                            return result
+                    if attempt >= policy.retries:
+                        raise
+                    await asyncio.sleep(backoff_delay(attempt))
+                    attempt += 1
+                    continue
+                delay = retry_after(response)
+                if response.status_code in THROTTLE_HTTP_RESPONSE:
+                    limiter.throttle(delay)
+                else:
+                    limiter.recover()
+                if policy.reconcile and response.status_code in AMBIGUOUS_HTTP_RESPONSE:
+                    if event is not None:
+                        self._emit('response', event.complete(response))
+                    error = response_error(response)
+                    result = await self._areconcile_create(path, payload, limiter,
+                                                           base_url, error)
+                    if result is not None:
+                        return result
+                    if attempt >= policy.retries:
+                        raise error
+                    await asyncio.sleep(backoff_delay(attempt, delay))
+                    attempt += 1
+                    continue
+                if response.status_code not in policy.statuses or attempt >= policy.retries:
+                    break
+                if event is not None:
+                    self._emit('response', event.complete(response))
+                await asyncio.sleep(backoff_delay(attempt, delay))
+                attempt += 1
+        finally:
+            self._strip_auth(payload)
+        return self._parse(response, event)
+
+    async def _areconcile_create(self,
+                                 path: str,
+                                 payload: dict,
+                                 limiter: RateLimiter,
+                                 base_url: str,
+                                 error: Exception) -> dict:
+        """Async equivalent of _reconcile_create()"""
+        try:
+            response = await self._apost(reconcile_path(path, payload), None, True, False,
+                                         None, limiter, base_url)
+        except (ApiError, ApiFailure, httpx.TransportError):
+            raise error from None
+        return reconcile_match(path, payload, response)
+
+    def _bind(self, cls: type) -> type:
+        """Return a subclass of cls whose API calls are made through this client"""
+        bound = self._bound.get(cls)
+        if bound is None:
+            bound = type(cls.__name__, (cls,), {'_client': self,
+                                                '__slots__': (),
+                                                '__module__': cls.__module__,
+                                                '__qualname__': cls.__qualname__})
+            self._bound[cls] = bound
+        return bound
+
+    @property
+    def dns(self) -> type:
+        """pyrkbun.dns class bound to this client"""
+        from .dns import Dns # pylint: disable = import-outside-toplevel
+        return self._bind(Dns)
+
+    @property
+    def async_dns(self) -> type:
+        """pyrkbun.aio.AsyncDns class bound to this client"""
+        from .aio import AsyncDns # pylint: disable = import-outside-toplevel
+        return self._bind(AsyncDns)
+
+    def ping(self, ipv4: bool = False) -> dict:
+        """Poll API host and return your own IP, see pyrkbun.ping"""
+        return self.post('/ping', force_v4=ipv4)
+
+    def ssl_get(self, domain: str) -> dict:
+        """Retrieve the SSL certificate bundle for the domain, see pyrkbun.ssl.get"""
+        return self.post(f'/ssl/retrieve/{domain}')
+
+    def pricing_get(self) -> dict:
+        """Retrieve default domain pricing for all TLDs, see pyrkbun.pricing.get"""
+        return self.post('/pricing/get', auth=False)
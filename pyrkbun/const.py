@@ -10,8 +10,37 @@ BASE_URL_V64: The default Porkbun API base URL supporting v4 and v6
 BASE_URL_V4: Optional Porkbun API base URL supporting IPv4 only.
     If used, the API ping request will always return you IPv4 address
 BASE_URL: Effective Base URL to be used for all API requests
+RATE_LIMIT: Minimum average interval in seconds between API requests
+RATE_BURST: Number of API requests that may be sent back to back after
+    an idle period before RATE_LIMIT spacing applies
+STATUS_RETRIES: Number of times a request is retried after the API
+    responds with a throttling status (429 or 503). Defaults to 2
+READ_RETRIES: Number of times a read only request (DNS retrieval, ping,
+    pricing and SSL) is retried after a transport error, throttling or
+    server error response. Defaults to STATUS_RETRIES
+BACKOFF_BASE: Base delay in seconds for exponential backoff between
+    throttled retries
+BACKOFF_MAX: Maximum delay in seconds between throttled retries
+SIMULATOR: If this holds any value all API requests are served by an
+    in-process simulator (pyrkbun.simulator) instead of the Porkbun API
+POOL_CONNECTIONS: Maximum number of concurrent connections held by the
+    shared HTTP client connection pool
+POOL_KEEPALIVE: Maximum number of idle keep-alive connections retained
+    by the shared HTTP client connection pool
+KEEPALIVE_EXPIRY: Seconds an idle keep-alive connection is retained
+CACHE_TTL: Seconds DNS retrieve responses are cached for by module level
+    API calls. Caching is disabled when not set
+CACHE_SIZE: Maximum number of DNS retrieve responses held in the cache
+CACHE_DIR: Directory holding the persistent pricing cache. Defaults to
+    pyrkbun under XDG_CACHE_HOME or ~/.cache
+PRICING_MAX_AGE: Seconds cached pricing data is served without a refresh
+    by the pricing CLI command. Zero disables its pricing cache. Library
+    calls only use the cache when given a max_age
+PRICING_STALE: Seconds beyond PRICING_MAX_AGE that cached pricing data is
+    still served while it is refreshed in the background
 """
 from os import getenv
+from pathlib import Path
 
 try:
     from dotenv import load_dotenv
@@ -25,9 +54,30 @@ API_KEY: str = getenv('PYRK_API_KEY')
 API_SECRET_KEY: str = getenv('PYRK_API_SECRET_KEY')
 FORCE_V4: str = getenv('PYRK_FORCE_V4')
 RATE_LIMIT: float = float(getenv('PYRK_RATE')) if getenv('PYRK_RATE') else 0
+RATE_BURST: int = int(getenv('PYRK_BURST')) if getenv('PYRK_BURST') else 1
 RETRIES: int = int(getenv('PYRK_RETRIES')) if getenv('PYRK_RETRIES') else 0
+STATUS_RETRIES: int = int(getenv('PYRK_STATUS_RETRIES')) if getenv('PYRK_STATUS_RETRIES') \
+    else 2
+READ_RETRIES: int = int(getenv('PYRK_READ_RETRIES')) if getenv('PYRK_READ_RETRIES') \
+    else STATUS_RETRIES
+BACKOFF_BASE: float = float(getenv('PYRK_BACKOFF')) if getenv('PYRK_BACKOFF') else 1.0
+BACKOFF_MAX: float = float(getenv('PYRK_BACKOFF_MAX')) if getenv('PYRK_BACKOFF_MAX') else 60.0
 TIMEOUT: int = int(getenv('PYRK_TIMEOUT')) if getenv('PYRK_TIMEOUT') else 15
 HTTP2: int = int(getenv('PYRK_HTTP2')) if getenv('PYRK_HTTP2') else False
+SIMULATOR: str = getenv('PYRK_SIMULATOR')
+POOL_CONNECTIONS: int = int(getenv('PYRK_POOL_CONNECTIONS')) if getenv('PYRK_POOL_CONNECTIONS') \
+    else 10
+POOL_KEEPALIVE: int = int(getenv('PYRK_POOL_KEEPALIVE')) if getenv('PYRK_POOL_KEEPALIVE') else 10
+KEEPALIVE_EXPIRY: float = float(getenv('PYRK_KEEPALIVE_EXPIRY')) \
+    if getenv('PYRK_KEEPALIVE_EXPIRY') else 30.0
+CACHE_TTL: float = float(getenv('PYRK_CACHE_TTL')) if getenv('PYRK_CACHE_TTL') else 0
+CACHE_SIZE: int = int(getenv('PYRK_CACHE_SIZE')) if getenv('PYRK_CACHE_SIZE') else 1024
+CACHE_DIR: Path = Path(getenv('PYRK_CACHE_DIR')) if getenv('PYRK_CACHE_DIR') \
+    else Path(getenv('XDG_CACHE_HOME') or Path.home() / '.cache') / 'pyrkbun'
+PRICING_MAX_AGE: float = float(getenv('PYRK_PRICING_MAX_AGE')) \
+    if getenv('PYRK_PRICING_MAX_AGE') else 86400.0
+PRICING_STALE: float = float(getenv('PYRK_PRICING_STALE')) if getenv('PYRK_PRICING_STALE') \
+    else 604800.0
 
 BASE_URL_V64: str = 'https://api.porkbun.com/api/json/v3'
 BASE_URL_V4: str = 'https://api-ipv4.porkbun.com/api/json/v3'
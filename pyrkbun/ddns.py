@@ -0,0 +1,186 @@
+"""Dynamic DNS: keep A and AAAA records pointing at this host
+
+A DynamicDns checks the public addresses of the host with the ping
+endpoints and updates the A and AAAA records of a domain when they change.
+The address last written to each record is kept in a state file, so a
+check finding the addresses unchanged costs one or two ping requests and
+no DNS API calls, including the first check after a restart.
+
+Example:
+>>> from pyrkbun.ddns import DynamicDns
+>>> ddns = DynamicDns('example.com', names=('', 'www'))
+>>> ddns.check()
+[{'type': 'A', 'name': '', 'content': '198.51.100.45', 'action': 'edited'},
+ {'type': 'A', 'name': 'www', 'content': '198.51.100.45', 'action': 'edited'}]
+>>> ddns.check()
+[]
+"""
+import time
+import random
+import ipaddress
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+import httpx
+
+from .dns import Dns
+from .cache import DiskCache
+from .const import ApiError, ApiFailure
+from .util import api_ping
+
+# Seconds between checks when run as a daemon
+INTERVAL: float = 300.0
+# Fraction of the interval checks are randomly spread by, so that many
+# hosts started together do not check in step
+JITTER: float = 0.1
+STATE_VERSION: int = 1
+
+
+class DynamicDns():
+    '''Update the A and AAAA records of a domain to the addresses of this host
+
+    Args:
+    domain: Domain holding the records
+    names (optional): Record names to update, relative to the domain.
+        Defaults to the domain itself ('')
+    ipv4 (optional): Maintain A records. Defaults to True
+    ipv6 (optional): Maintain AAAA records. Defaults to True
+    ttl (optional): TTL of created and edited records. Defaults to '600'
+    state_file (optional): Path of the state file. Defaults to
+        ddns-<domain>.json in CACHE_DIR
+    client (optional): PorkbunClient used for API calls. Defaults to the
+        default client
+
+    Usage:
+    Call check() from a scheduler, or iterate run() to check on an interval.
+    A host without IPv6 connectivity leaves AAAA records untouched.
+    '''
+
+    def __init__(self, # pylint: disable = too-many-arguments
+                 domain: str,
+                 names: Iterable[str] = ('',),
+                 ipv4: bool = True,
+                 ipv6: bool = True,
+                 ttl: str = '600',
+                 state_file: str = None,
+                 client=None):
+        if not (ipv4 or ipv6):
+            raise ValueError('At least one of ipv4 and ipv6 must be enabled')
+        self.domain = domain
+        self.names = tuple('' if name in ('@', domain) else name.removesuffix(f'.{domain}')
+                           for name in names)
+        self.ipv4 = ipv4
+        self.ipv6 = ipv6
+        self.ttl = str(ttl)
+        path = Path(state_file) if state_file else None
+        self.state = DiskCache(f'ddns-{domain}.json') if path is None \
+            else DiskCache(path.name, path.parent)
+        self.client = client
+        self._dns = Dns if client is None else client.dns
+        _, data = self.state.load()
+        # Address last written to each record, keyed by 'TYPE name'
+        self.records: dict = data.get('records', {}) \
+            if isinstance(data, dict) and data.get('version') == STATE_VERSION else {}
+
+    def __repr__(self) -> str:
+        return f'DynamicDns({self.domain!r}, names={self.names!r})'
+
+    def addresses(self) -> dict:
+        """Return the public addresses of this host by record type
+
+        The dual stack endpoint answers over IPv6 when the host has IPv6
+        connectivity. Otherwise its IPv4 answer is used and the IPv4 only
+        endpoint is not called. Addresses of a protocol the host cannot
+        connect over are left out.
+
+        Example:
+        >>> ddns.addresses()
+        {'A': '198.51.100.45', 'AAAA': '2001:db8:85a3::8a2e:370:7334'}
+        """
+        result = {}
+        failure = None
+        if self.ipv6:
+            try:
+                address = ipaddress.ip_address(api_ping(client=self.client)['yourIp'])
+            except httpx.TransportError as error:
+                address, failure = None, error
+            if address is not None and address.version == 6:
+                result['AAAA'] = str(address)
+            elif address is not None and self.ipv4:
+                result['A'] = str(address)
+        if self.ipv4 and 'A' not in result:
+            try:
+                result['A'] = api_ping(ipv4=True, client=self.client)['yourIp']
+            except httpx.TransportError as error:
+                failure = error
+        # A host may lack connectivity over one protocol, but not both
+        if not result and failure is not None:
+            raise failure
+        return result
+
+    def _update(self, record_type: str, name: str, address: str) -> str:
+        """Point the records of a name and type at an address, returning the action"""
+        # Retrieving by type without a name returns records of all names
+        records = [record for record in self._dns.get_records(self.domain, record_type, name)
+                   if record.name == name]
+        if not records:
+            self._dns.create_record(self.domain, {'name': name, 'type': record_type,
+                                                  'content': address, 'ttl': self.ttl})
+            return 'created'
+        if all(record.content == address for record in records):
+            return 'unchanged'
+        self._dns.edit_record(self.domain, {'content': address, 'ttl': self.ttl},
+                              record_type, name)
+        return 'edited'
+
+    def check(self) -> list[dict]:
+        """Update records whose address has changed since it was last written
+
+        Returns:
+        List of dicts with the type, name, content and action ('created',
+        'edited' or 'unchanged') of each record checked with the DNS API.
+        Records already holding the current address according to the state
+        file are not checked and not included.
+        """
+        results = []
+        for record_type, address in self.addresses().items():
+            for name in self.names:
+                key = f'{record_type} {name}'
+                if self.records.get(key) == address:
+                    continue
+                action = self._update(record_type, name, address)
+                self.records[key] = address
+                self.state.save({'version': STATE_VERSION, 'domain': self.domain,
+                                 'records': self.records})
+                results.append({'type': record_type, 'name': name, 'content': address,
+                                'action': action})
+        return results
+
+    def run(self,
+            interval: float = INTERVAL,
+            checks: int = None,
+            on_error: Callable = None,
+            sleep: Callable = time.sleep) -> Iterator[list[dict]]:
+        """Check on an interval until stopped, yielding the result of each check
+
+        Args:
+        interval (optional): Seconds between checks. Defaults to INTERVAL
+        checks (optional): Number of checks to make. Defaults to checking forever
+        on_error (optional): Called with API and transport errors raised by a
+            check, which is then retried at the next interval. Defaults to
+            raising the error
+        sleep (optional): Function called with the seconds to wait between
+            checks. Defaults to time.sleep
+        """
+        count = 0
+        while checks is None or count < checks:
+            if count:
+                sleep(interval * random.uniform(1 - JITTER, 1 + JITTER))
+            count += 1
+            try:
+                results = self.check()
+            except (ApiError, ApiFailure, httpx.HTTPError) as error:
+                if on_error is None:
+                    raise
+                on_error(error)
+                continue
+            yield results
@@ -0,0 +1,186 @@
+"""Compare the DNS records of a zone with a desired set of records
+
+Records are normalised into canonical dicts (unqualified lower case name,
+string TTL and priority, empty notes by default) and matched with hash
+lookups, so a diff costs time linear in the number of records.
+
+A desired record with an ID is matched to the existing record with that ID.
+A desired record without an ID is matched to an existing record with the
+same name, type and content. Each existing record is matched at most once,
+in the order desired records are given.
+
+Example:
+>>> from pyrkbun.diff import diff_records
+>>> existing = pyrkbun.dns.get_records('example.com')
+>>> desired = [{'name': 'www', 'type': 'A', 'content': '198.51.100.45', 'ttl': '600'}]
+>>> changes = diff_records(existing, desired, 'example.com')
+>>> changes.summary()
+{'create': 1, 'edit': 0, 'delete': 11, 'unchanged': 0, 'ignored': 0}
+"""
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+
+# Record fields compared by a diff, in API payload order
+FIELDS: tuple = ('name', 'type', 'content', 'ttl', 'prio', 'notes')
+# Values the API assumes when a field is not provided
+DEFAULTS: dict = {'name': '', 'ttl': '600', 'prio': '0', 'notes': ''}
+# Diff actions, in the order changes are reported
+ACTIONS: tuple = ('create', 'edit', 'delete', 'unchanged', 'ignored')
+
+def _as_dict(record) -> dict:
+    """Return a Dns instance as an API style record dict"""
+    if isinstance(record, dict):
+        return record
+    return {'name': record.name, 'type': record.record_type, 'content': record.content,
+            'ttl': record.ttl, 'prio': record.prio, 'notes': record.notes,
+            'id': record.record_id}
+
+def normalise(record, domain: str) -> dict:
+    """Return the canonical form of a record dict or Dns instance
+
+    Names are made relative to the domain and lower cased, missing or null
+    fields take the API defaults and values are strings. An 'id' key is
+    included only when the record has a non-empty ID.
+    """
+    record = _as_dict(record)
+    result = {}
+    for key in FIELDS:
+        value = record.get(key)
+        result[key] = DEFAULTS.get(key, '') if value is None else str(value)
+    name = result['name'].lower().rstrip('.')
+    domain = domain.lower()
+    result['name'] = '' if name == domain else name.removesuffix(f'.{domain}')
+    result['type'] = result['type'].upper()
+    record_id = record.get('id')
+    if record_id is not None and str(record_id):
+        result['id'] = str(record_id)
+    return result
+
+def record_key(record: dict) -> tuple:
+    """Hashable key of all compared fields of a normalised record"""
+    return tuple(record[key] for key in FIELDS)
+
+def match_key(record: dict) -> tuple:
+    """Hashable (name, type, content) key of a normalised record"""
+    return record['name'], record['type'], record['content']
+
+
+@dataclass
+class ZoneDiff():
+    '''Changes required to turn existing records into desired records
+
+    Args:
+    create: Desired records with no existing match, to be created
+    edit: Desired records differing from their existing match, including
+        the ID of the record to edit
+    delete: Existing records not matched by any desired record
+    unchanged: Existing records matching a desired record exactly
+    ignored: Desired records with an ID not found in the zone, as provided
+    '''
+    create: list = field(default_factory=list)
+    edit: list = field(default_factory=list)
+    delete: list = field(default_factory=list)
+    unchanged: list = field(default_factory=list)
+    ignored: list = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.create or self.edit or self.delete)
+
+    def summary(self) -> dict:
+        """Return the number of records for each action"""
+        return {action: len(getattr(self, action)) for action in ACTIONS}
+
+
+def iter_changes(existing: Iterable, desired: Iterable, domain: str) -> Iterator[tuple]:
+    """Yield (action, record) pairs turning existing records into desired
+
+    Existing records are indexed up front, desired records are consumed
+    lazily and their actions yielded as they are matched. Deletions of
+    unmatched existing records are yielded last.
+
+    Args:
+    existing: Records currently in the zone, as dicts or Dns instances
+    desired: Records the zone should contain, as dicts or Dns instances
+    domain: Domain of the zone, used to normalise record names
+
+    Yields:
+    Tuples of an action from ACTIONS and a normalised record. Ignored
+    records are yielded as provided.
+    """
+    by_id: dict = {}
+    by_match: dict = {}
+    for record in existing:
+        record = normalise(record, domain)
+        by_id[record['id']] = record
+        by_match.setdefault(match_key(record), deque()).append(record['id'])
+    matched: set = set()
+
+    for original in desired:
+        record = normalise(original, domain)
+        record_id = record.get('id')
+        if record_id is None:
+            candidates = by_match.get(match_key(record), ())
+            while candidates and candidates[0] in matched:
+                candidates.popleft()
+            if not candidates:
+                yield 'create', record
+                continue
+            record_id = record['id'] = candidates.popleft()
+        elif record_id not in by_id or record_id in matched:
+            yield 'ignored', original
+            continue
+        matched.add(record_id)
+        current = by_id[record_id]
+        if record_key(record) == record_key(current):
+            yield 'unchanged', current
+        else:
+            yield 'edit', record
+
+    for record_id, record in by_id.items():
+        if record_id not in matched:
+            yield 'delete', record
+
+def reuse_records(changes: ZoneDiff) -> ZoneDiff:
+    """Turn pairs of records to delete and create into edits, in place
+
+    Each record to create is paired with a record to delete of the same
+    type, preferring one with the same name, and the pair replaced by an
+    edit of the deleted record. One API call is then made instead of two.
+    """
+    # Records are paired by name and type first, then by type alone
+    for key in ((lambda record: (record['name'], record['type'])),
+                (lambda record: record['type'])):
+        if not (changes.create and changes.delete):
+            break
+        spare: dict = {}
+        for record in changes.delete:
+            spare.setdefault(key(record), deque()).append(record)
+        create = []
+        for record in changes.create:
+            candidates = spare.get(key(record))
+            if candidates:
+                changes.edit.append(dict(record, id=candidates.popleft()['id']))
+            else:
+                create.append(record)
+        changes.create = create
+        remaining = {record['id'] for candidates in spare.values() for record in candidates}
+        changes.delete = [record for record in changes.delete if record['id'] in remaining]
+    return changes
+
+def diff_records(existing: Iterable,
+                 desired: Iterable,
+                 domain: str,
+                 reuse: bool = False) -> ZoneDiff:
+    """Compute the changes turning existing records into desired records
+
+    See iter_changes() for arguments and matching rules.
+
+    Args:
+    reuse (optional): Edit records that would be deleted into records that
+        would be created, see reuse_records(). Defaults to False
+    """
+    result = ZoneDiff()
+    for action, record in iter_changes(existing, desired, domain):
+        getattr(result, action).append(record)
+    return reuse_records(result) if reuse else result
@@ -1,11 +1,128 @@
 """Porkbun DNS API
 """
-from dataclasses import dataclass, field
+import copy
+from typing import Iterator
+from dataclasses import dataclass
 
 from .const import SUPPORTED_DNS_RECORD_TYPES
-from .util import api_post
+from .util import api_post, api_stream
 
-@dataclass
+API_PATH: str = '/dns'
+
+def _retrieve_path(domain: str,
+                   record_type: str = None,
+                   name: str = None,
+                   record_id: str = None) -> str:
+    """Build API path to retrieve records by ID, type and name, or all records"""
+    if record_type:
+        assert record_type in SUPPORTED_DNS_RECORD_TYPES
+
+    if record_id or name:
+        return f'{API_PATH}/retrieve/{domain}/{record_id}' if record_id \
+            else f'{API_PATH}/retrieveByNameType/{domain}/{record_type}/{name}'
+    return f'{API_PATH}/retrieveByNameType/{domain}/{record_type}' if record_type \
+        else f'{API_PATH}/retrieve/{domain}'
+
+def _delete_path(domain: str,
+                 record_type: str = None,
+                 name: str = None,
+                 record_id: str = None) -> str:
+    """Build API path to delete a record by ID or by type and name"""
+    if record_type:
+        assert record_type in SUPPORTED_DNS_RECORD_TYPES
+
+    return f'{API_PATH}/delete/{domain}/{record_id}' if record_id \
+        else f'{API_PATH}/deleteByNameType/{domain}/{record_type}/{name}'
+
+def _edit_path(domain: str,
+               record_type: str = None,
+               name: str = None,
+               record_id: str = None) -> str:
+    """Build API path to edit a record by ID or by type and name"""
+    if record_type:
+        assert record_type in SUPPORTED_DNS_RECORD_TYPES
+
+    return f'{API_PATH}/edit/{domain}/{record_id}' if record_id \
+        else f'{API_PATH}/editByNameType/{domain}/{record_type}/{name}'
+
+def _record_from_api(cls, domain: str, record: dict) -> 'Dns':
+    """Create an instance of cls from a record in an API response"""
+    # The PorkBun API is not returning 'notes' with records
+    # Checking for 'notes' in response keys and adding if needed
+    # Have raised issue with Porkbun support team
+    if 'notes' not in record.keys():
+        record['notes'] = ''
+    return cls(domain,
+               record['type'],
+               record['content'],
+               record['name'],
+               record['ttl'],
+               record['prio'],
+               record['notes'],
+               record['id'])
+
+def _records_from_response(cls, domain: str, api_response: dict) -> list:
+    """Create instances of cls from the records in an API response"""
+    return [_record_from_api(cls, domain, record) for record in api_response['records']]
+
+def _record_payload(record: 'Dns') -> dict:
+    """Build API create/edit payload from record instance attributes"""
+    return {'name': record.name,
+            'type': record.record_type,
+            'content': record.content,
+            'ttl': record.ttl,
+            'prio': record.prio,
+            'notes': record.notes}
+
+def _refresh_from_response(record: 'Dns', api_response: dict) -> None:
+    """Update record instance attributes from an API retrieve response"""
+    api_record: dict = api_response['records'][0]
+    if 'notes' not in api_record.keys():
+        api_record['notes'] = ''
+    record.name = api_record['name']
+    record.record_type = api_record['type']
+    record.content = api_record['content']
+    record.ttl = api_record['ttl']
+    record.prio = api_record['prio']
+    record.notes = api_record['notes']
+    record.record_id = api_record['id']
+
+# Dns attributes in positional argument order
+FIELDS: tuple = ('domain', 'record_type', 'content', 'name', 'ttl', 'prio', 'notes', 'record_id')
+
+def _normalise_name(record: 'Dns', value: str) -> str:
+    domain = record.domain
+    if value == domain:
+        return ''
+    return value.removesuffix(f'.{domain}') if value.endswith(domain) else value
+
+def _normalise_type(record: 'Dns', value: str) -> str: # pylint: disable = unused-argument
+    assert value in SUPPORTED_DNS_RECORD_TYPES
+    return value
+
+def _normalise_notes(record: 'Dns', value: str) -> str: # pylint: disable = unused-argument
+    # Porkbun are working on notes return, but now its returning null instead
+    # of an empty string. This check simply ensures type consistency for this field
+    return '' if value is None else value
+
+def _normalise_prio(record: 'Dns', value: str) -> str: # pylint: disable = unused-argument
+    # For certain record types the API is returning null for priotiy instead of a value.
+    # Ensuring type consistency by setting null values to string value zero -> '0'.
+    return '0' if value is None else value
+
+def _normalise_id(record: 'Dns', value) -> str: # pylint: disable = unused-argument
+    # When creating a record the ID value is returned as an int.
+    # Ensuring value is always stored as a string for type safety
+    return str(value)
+
+# Normalisation applied when a Dns attribute is assigned
+_NORMALISERS: dict = {'name': _normalise_name,
+                      'record_type': _normalise_type,
+                      'notes': _normalise_notes,
+                      'prio': _normalise_prio,
+                      'record_id': _normalise_id}
+
+@dataclass(init=False, repr=False, eq=False)
 class Dns():
     '''Class representing a DNS record
 
@@ -29,6 +146,15 @@ class Dns():
     Alternatively, a range of class methods are available to send API
     commands without the need to first instantiate the class.
 
+    Records of a specific PorkbunClient are managed through its dns
+    attribute, which takes the same arguments and provides the same methods.
+    Such records compare equal to plain records with the same attributes, and
+    are pickled as plain records as the client itself cannot be pickled.
+
+    Records are dataclasses, so dataclasses.fields(), asdict() and replace()
+    may be used with them. Attributes are held in slots, so records have no
+    __dict__ and vars() cannot be used, use to_dict() instead.
+
     Example:
     >>> x = pyrkbun.dns('example.com',
                         'A',
@@ -42,59 +168,89 @@ class Dns():
     >>> x.delete()
     '''
 
-    # Just the right number of instance attributes
-    # pylint: disable=too-many-instance-attributes
+    # Instances hold their attributes in slots rather than a per instance
+    # __dict__, as zones may be loaded with many thousands of records.
+    # Subclasses must declare __slots__ = () to keep this saving
+    __slots__ = FIELDS
     domain: str
     record_type: str
     content: str
-    name: str = ''
-    ttl: str = '600'
-    prio: str = '0'
-    notes: str = ''
-    record_id: str = ''
-
-    __api_path: str = field(default='/dns', init=False, repr=False)
+    name: str
+    ttl: str
+    prio: str
+    notes: str
+    record_id: str
+    # Instances are mutable and compare by value
+    __hash__ = None
+    # PorkbunClient used for API calls, None uses the default client. Set on
+    # the classes provided by PorkbunClient.dns
+    _client = None
+
+    def __init__(self, # pylint: disable = too-many-arguments
+                 domain: str,
+                 record_type: str,
+                 content: str,
+                 name: str = '',
+                 ttl: str = '600',
+                 prio: str = '0',
+                 notes: str = '',
+                 record_id: str = ''):
+        # Attributes are normalised as by __setattr__, without the dispatch
+        assert record_type in SUPPORTED_DNS_RECORD_TYPES
+        setter = object.__setattr__
+        setter(self, 'domain', domain)
+        setter(self, 'record_type', record_type)
+        setter(self, 'content', content)
+        setter(self, 'name', _normalise_name(self, name) if name else name)
+        setter(self, 'ttl', ttl)
+        setter(self, 'prio', '0' if prio is None else prio)
+        setter(self, 'notes', '' if notes is None else notes)
+        setter(self, 'record_id', record_id if record_id.__class__ is str else str(record_id))
 
     def __setattr__(self, name, value):
-        if name == 'name':
-            value: str = '' if value == self.domain \
-                else value.removesuffix(f'.{self.domain}')
-        elif name == 'record_type':
-            assert value in SUPPORTED_DNS_RECORD_TYPES
-        elif name == 'notes':
-            # Porkbun are working on notes return, but now its returning null instead
-            # of an empty string. This check simply ensures type consistency for this field
-            value = '' if value is None else value
-        elif name == 'prio':
-            # For certain record types the API is returning null for priotiy instead of a value.
-            # Ensuring type consistency by setting null values to string value zero -> '0'.
-            value = '0' if value is None else value
-        elif name == 'record_id':
-            # When creating a record the ID value is returned as an int.
-            # Ensuring value is always stored as a string for type safety
-            value = str(value)
-        super().__setattr__(name, value)
+        normalise = _NORMALISERS.get(name)
+        if normalise is not None:
+            value = normalise(self, value)
+        object.__setattr__(self, name, value)
+
+    def __repr__(self) -> str:
+        values = ', '.join(f'{field}={getattr(self, field)!r}' for field in FIELDS)
+        return f'{self.__class__.__qualname__}({values})'
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Dns):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in FIELDS)
+
+    def __reduce__(self) -> tuple:
+        # Classes bound to a PorkbunClient are not importable by name, so
+        # records are pickled as instances of the class they were bound from
+        cls = self.__class__
+        if cls._client is not None and '_client' in cls.__dict__:
+            cls = cls.__base__
+        return cls, tuple(getattr(self, field) for field in FIELDS)
+
+    def __copy__(self) -> 'Dns':
+        return self.__class__(*(getattr(self, field) for field in FIELDS))
+
+    def __deepcopy__(self, memo: dict) -> 'Dns':
+        return self.__class__(*(copy.deepcopy(getattr(self, field), memo) for field in FIELDS))
+
+    def to_dict(self) -> dict:
+        """Return the record as a dict of its attributes
+
+        Example:
+        >>> pyrkbun.dns('example.com', 'A', '198.51.100.45', 'www').to_dict()
+        {'domain': 'example.com', 'record_type': 'A', 'content': '198.51.100.45',
+        'name': 'www', 'ttl': '600', 'prio': '0', 'notes': '', 'record_id': ''}
+        """
+        return {field: getattr(self, field) for field in FIELDS}
 
     @classmethod
     def __cls_creator_formatter(cls, domain, api_response) -> list['Dns']:
         """Format API response and create class instances
         """
-        records =[]
-        for record in api_response['records']:
-            # The PorkBun API is not returning 'notes' with records
-            # Checking for 'notes' in response keys and adding if needed
-            # Have raised issue with Porkbun support team
-            if 'notes' not in record.keys():
-                record['notes'] = ''
-            records.append(cls(domain,
-                               record['type'],
-                               record['content'],
-                               record['name'],
-                               record['ttl'],
-                               record['prio'],
-                               record['notes'],
-                               record['id']))
-        return records
+        return _records_from_response(cls, domain, api_response)
 
     @classmethod
     def get_records(cls,
@@ -143,20 +299,33 @@ class Dns():
         content='mail.example.com', ttl='650', prio='10', notes='',
         record_id='253440860'), Dns(domain='example.com', .... ]
         """
-        if record_type:
-            assert record_type in SUPPORTED_DNS_RECORD_TYPES
-
-        if record_id or name:
-            path = f'{cls.__api_path}/retrieve/{domain}/{record_id}' if record_id \
-                else f'{cls.__api_path}/retrieveByNameType/{domain}/{record_type}/{name}'
-        else:
-            path = f'{cls.__api_path}/retrieveByNameType/{domain}/{record_type}' if record_type \
-                else f'{cls.__api_path}/retrieve/{domain}'
-
-        response = api_post(path)
+        path = _retrieve_path(domain, record_type, name, record_id)
+        response = api_post(path, client=cls._client)
         records = cls.__cls_creator_formatter(domain, response)
         return records
 
+    @classmethod
+    def iter_records(cls,
+                     domain: str,
+                     record_type: str = None,
+                     name: str = None,
+                     record_id: str = None) -> Iterator['Dns']:
+        """Yield DNS records one at a time as the API response is received
+
+        Takes the same arguments as get_records, but records are decoded
+        incrementally so memory use stays bounded for very large zones.
+        Records are never served from the record cache.
+
+        Example:
+        >>> for record in pyrkbun.dns.iter_records('example.com', 'TXT'):
+        ...     print(record.name, record.content)
+        _dmarc v=DMARC1; p=none
+        ...
+        """
+        path = _retrieve_path(domain, record_type, name, record_id)
+        for record in api_stream(path, ('records',), client=cls._client):
+            yield _record_from_api(cls, domain, record)
+
     @classmethod
     def create_record(cls,
                       domain: str,
@@ -177,8 +346,8 @@ class Dns():
         >>> print(x)
         {'status': 'SUCCESS', 'id': 253475380}
         """
-        path = f'{cls.__api_path}/create/{domain}/'
-        response = api_post(path, record)
+        path = f'{API_PATH}/create/{domain}/'
+        response = api_post(path, record, client=cls._client)
         return response
 
     @classmethod
@@ -203,12 +372,8 @@ class Dns():
         >>> print(x)
         {'status': 'SUCCESS'}
         """
-        if record_type:
-            assert record_type in SUPPORTED_DNS_RECORD_TYPES
-
-        path = f'{cls.__api_path}/delete/{domain}/{record_id}' if record_id \
-            else f'{cls.__api_path}/deleteByNameType/{domain}/{record_type}/{name}'
-        response = api_post(path)
+        path = _delete_path(domain, record_type, name, record_id)
+        response = api_post(path, client=cls._client)
         return response
 
     @classmethod
@@ -234,12 +399,8 @@ class Dns():
         >>> print(x)
         {'status': 'SUCCESS'}
         """
-        if record_type:
-            assert record_type in SUPPORTED_DNS_RECORD_TYPES
-
-        path = f'{cls.__api_path}/edit/{domain}/{record_id}' if record_id \
-            else f'{cls.__api_path}/editByNameType/{domain}/{record_type}/{name}'
-        response = api_post(path, updates)
+        path = _edit_path(domain, record_type, name, record_id)
+        response = api_post(path, updates, client=cls._client)
         return response
 
     def refresh(self) -> dict:
@@ -262,18 +423,9 @@ class Dns():
         Dns(domain='example.com', record_type='A', content='198.51.100.45',
         name='web', ttl='620', prio='0', notes='Company website', record_id='253916852')
         """
-        path = f'{self.__api_path}/retrieve/{self.domain}/{self.record_id}'
-        response = api_post(path)
-        record: dict = response['records'][0]
-        if 'notes' not in record.keys():
-            record['notes'] = ''
-        self.name = record['name']
-        self.record_type = record['type']
-        self.content = record['content']
-        self.ttl = record['ttl']
-        self.prio = record['prio']
-        self.notes = record['notes']
-        self.record_id = record['id']
+        path = _retrieve_path(self.domain, record_id=self.record_id)
+        response = api_post(path, client=self._client)
+        _refresh_from_response(self, response)
         return response
 
     def create(self) -> dict:
@@ -301,14 +453,9 @@ class Dns():
         Dns(domain='example.com', record_type='A', content='198.51.100.45',
         name='www', ttl='620', prio='0', notes='Company website', record_id='253916852')
         """
-        path = f'{self.__api_path}/create/{self.domain}'
-        payload = {'name': self.name,
-                   'type': self.record_type,
-                   'content': self.content,
-                   'ttl': self.ttl,
-                   'prio': self.prio,
-                   'notes': self.notes}
-        response = api_post(path, payload)
+        path = f'{API_PATH}/create/{self.domain}'
+        payload = _record_payload(self)
+        response = api_post(path, payload, client=self._client)
         self.record_id = response['id']
         return response
 
@@ -337,14 +484,9 @@ class Dns():
         Note: Attempting an update without any valid changes to the DNS
         record will result in an API Error.
         """
-        path = f'{self.__api_path}/edit/{self.domain}/{self.record_id}'
-        payload = {'name': self.name,
-                   'type': self.record_type,
-                   'content': self.content,
-                   'ttl': self.ttl,
-                   'prio': self.prio,
-                   'notes': self.notes}
-        response = api_post(path, payload)
+        path = _edit_path(self.domain, record_id=self.record_id)
+        payload = _record_payload(self)
+        response = api_post(path, payload, client=self._client)
         return response
 
     def delete(self) -> dict:
@@ -363,6 +505,6 @@ class Dns():
         >>> print(result)
         {'status': 'SUCCESS'}
         """
-        path = f'{self.__api_path}/delete/{self.domain}/{self.record_id}'
-        response = api_post(path)
+        path = _delete_path(self.domain, record_id=self.record_id)
+        response = api_post(path, client=self._client)
         return response
@@ -0,0 +1,272 @@
+"""Request instrumentation and metrics
+
+Every API request attempt made by a PorkbunClient can be observed through
+hooks. Request hooks are called with a RequestEvent before the request is
+sent and response hooks are called with the completed event once the
+response (or transport error) has been received and decoded.
+
+A MetricsCollector is a ready made response hook aggregating events into
+per endpoint counters and latency histograms, exportable as a dict or in
+Prometheus text exposition format.
+
+Example:
+>>> import pyrkbun
+>>> from pyrkbun.metrics import MetricsCollector
+>>> metrics = MetricsCollector().install()
+>>> pyrkbun.dns.get_records('example.com')
+>>> print(metrics.to_prometheus())
+# HELP pyrkbun_requests_total API requests by endpoint and HTTP status
+# TYPE pyrkbun_requests_total counter
+pyrkbun_requests_total{endpoint="/dns/retrieve",status="200"} 1
+...
+"""
+import time
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass, field
+
+import httpx
+
+from .const import VALID_HTTP_RESPONSE
+from .retry import THROTTLE_HTTP_RESPONSE, endpoint
+
+# Connection level phases reported by the httpx trace extension, mapped to
+# the RequestEvent attribute holding their duration
+_TRACE_PHASES: dict = {'connection.connect_tcp': 'connect',
+                       'connection.start_tls': 'tls'}
+
+
+@dataclass
+class RequestEvent(): # pylint: disable = too-many-instance-attributes
+    '''A single API request attempt, passed to client hooks
+
+    Durations are in seconds and are None when the phase did not happen or
+    could not be observed. Connection and server timings are taken from
+    the httpx trace extension, which custom transports may not support.
+
+    Args:
+    path: API path of the request (e.g. /dns/retrieve/example.com)
+    attempt: Zero based attempt number, non-zero attempts are retries
+    queued: Time spent waiting on the rate limiter before sending
+    '''
+    path: str
+    attempt: int = 0
+    queued: float = 0.0
+    endpoint: str = ''
+    connect: float = None
+    tls: float = None
+    server: float = None
+    decode: float = None
+    elapsed: float = None
+    status: int = None
+    error: str = None
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    started: float = field(default_factory=time.perf_counter, repr=False)
+    _marks: dict = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        self.endpoint = self.endpoint or endpoint(self.path)
+
+    @property
+    def throttled(self) -> bool:
+        """True if the API responded with a throttling status"""
+        return self.status in THROTTLE_HTTP_RESPONSE
+
+    @property
+    def failed(self) -> bool:
+        """True if the request raised a transport error or was not successful"""
+        return self.error is not None or self.status not in VALID_HTTP_RESPONSE
+
+    def trace(self, name: str, info: dict) -> None: # pylint: disable = unused-argument
+        """Record connection and server timings, used as the httpx trace extension"""
+        phase, _, stage = name.rpartition('.')
+        now = time.perf_counter()
+        if stage == 'started':
+            self._marks[phase] = now
+        elif stage == 'complete':
+            if phase in _TRACE_PHASES and phase in self._marks:
+                setattr(self, _TRACE_PHASES[phase], now - self._marks[phase])
+            elif phase.endswith('.receive_response_headers'):
+                sent = self._marks.get(phase.replace('receive_response', 'send_request'))
+                if sent is not None:
+                    self.server = now - sent
+
+    async def atrace(self, name: str, info: dict) -> None:
+        """Async httpx trace extension"""
+        self.trace(name, info)
+
+    def complete(self, response=None, error: Exception = None) -> 'RequestEvent':
+        """Record the outcome of the attempt"""
+        self.elapsed = time.perf_counter() - self.started
+        if response is not None:
+            self.status = response.status_code
+            self.bytes_sent = len(response.request.content)
+            try:
+                self.bytes_received = len(response.content)
+            except httpx.ResponseNotRead:
+                # Streamed responses are counted as they are consumed
+                pass
+        if error is not None:
+            self.error = type(error).__name__
+            try:
+                self.bytes_sent = len(error.request.content)
+            except RuntimeError:
+                pass
+        return self
+
+
+class MetricsCollector():
+    '''Aggregate API request events into per endpoint metrics
+
+    Args:
+    buckets (optional): Upper bounds in seconds of the latency histogram
+        buckets. Defaults to MetricsCollector.buckets
+
+    Usage:
+    Install the collector as a response hook with install(), which
+    defaults to the clients used by module level API calls, or pass a
+    PorkbunClient to instrument it instead. Collectors are thread safe and
+    one collector may be installed on several clients.
+    '''
+
+    buckets: tuple = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    # Request phases aggregated as sum and count
+    phases: tuple = ('queued', 'connect', 'tls', 'server', 'decode')
+
+    def __init__(self, buckets: tuple = None):
+        if buckets is not None:
+            self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._endpoints: dict = {}
+
+    def __call__(self, event: RequestEvent) -> None:
+        self.record(event)
+
+    def install(self, client=None) -> 'MetricsCollector':
+        """Register as a response hook of client, or of the default clients"""
+        if client is None:
+            # pylint: disable = import-outside-toplevel
+            from .util import DEFAULT_HOOKS
+            hooks = DEFAULT_HOOKS
+        else:
+            hooks = client.hooks
+        if self not in hooks['response']:
+            hooks['response'].append(self)
+        return self
+
+    def uninstall(self, client=None) -> None:
+        """Remove from the response hooks of client, or of the default clients"""
+        if client is None:
+            # pylint: disable = import-outside-toplevel
+            from .util import DEFAULT_HOOKS
+            hooks = DEFAULT_HOOKS
+        else:
+            hooks = client.hooks
+        if self in hooks['response']:
+            hooks['response'].remove(self)
+
+    def reset(self) -> None:
+        """Discard all collected metrics"""
+        with self._lock:
+            self._endpoints = {}
+
+    def _new_endpoint(self) -> dict:
+        return {'requests': {}, 'errors': {}, 'retries': 0, 'throttled': 0,
+                'bytes_sent': 0, 'bytes_received': 0,
+                'latency': {'buckets': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0},
+                'phases': {phase: {'sum': 0.0, 'count': 0} for phase in self.phases}}
+
+    def record(self, event: RequestEvent) -> None:
+        """Add a completed request event to the metrics"""
+        with self._lock:
+            metrics = self._endpoints.get(event.endpoint)
+            if metrics is None:
+                metrics = self._endpoints[event.endpoint] = self._new_endpoint()
+            if event.status is not None:
+                metrics['requests'][event.status] = metrics['requests'].get(event.status, 0) + 1
+            if event.failed:
+                kind = event.error or str(event.status)
+                metrics['errors'][kind] = metrics['errors'].get(kind, 0) + 1
+            metrics['retries'] += event.attempt > 0
+            metrics['throttled'] += event.throttled
+            metrics['bytes_sent'] += event.bytes_sent
+            metrics['bytes_received'] += event.bytes_received
+            if event.elapsed is not None:
+                latency = metrics['latency']
+                latency['buckets'][bisect_left(self.buckets, event.elapsed)] += 1
+                latency['sum'] += event.elapsed
+                latency['count'] += 1
+            for phase in self.phases:
+                value = getattr(event, phase)
+                if value is not None:
+                    metrics['phases'][phase]['sum'] += value
+                    metrics['phases'][phase]['count'] += 1
+
+    def to_dict(self) -> dict:
+        """Return a snapshot of the metrics keyed by endpoint
+
+        Histogram buckets are cumulative and keyed by their upper bound,
+        with '+Inf' counting all observations.
+        """
+        with self._lock:
+            result = {}
+            for name, metrics in sorted(self._endpoints.items()):
+                latency = metrics['latency']
+                cumulative, buckets = 0, {}
+                for bound, count in zip(self.buckets + ('+Inf',), latency['buckets']):
+                    cumulative += count
+                    buckets[str(bound)] = cumulative
+                result[name] = {'requests': dict(metrics['requests']),
+                                'errors': dict(metrics['errors']),
+                                'retries': metrics['retries'],
+                                'throttled': metrics['throttled'],
+                                'bytes_sent': metrics['bytes_sent'],
+                                'bytes_received': metrics['bytes_received'],
+                                'latency': {'buckets': buckets,
+                                            'sum': latency['sum'],
+                                            'count': latency['count']},
+                                'phases': {phase: dict(value) for phase, value
+                                           in metrics['phases'].items()}}
+            return result
+
+    def to_prometheus(self, prefix: str = 'pyrkbun') -> str:
+        """Return the metrics in Prometheus text exposition format"""
+        snapshot = self.to_dict()
+        families = [('requests_total', 'counter', 'API requests by endpoint and HTTP status'),
+                    ('errors_total', 'counter', 'Failed API requests by endpoint and error'),
+                    ('retries_total', 'counter', 'Retried API request attempts'),
+                    ('throttled_total', 'counter', 'API responses signalling throttling'),
+                    ('sent_bytes_total', 'counter', 'Request body bytes sent'),
+                    ('received_bytes_total', 'counter', 'Response body bytes received'),
+                    ('request_duration_seconds', 'histogram', 'API request latency'),
+                    ('phase_seconds', 'summary', 'Time spent in each request phase')]
+        lines = []
+        for family, kind, description in families:
+            name = f'{prefix}_{family}'
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {kind}')
+            for path, metrics in snapshot.items():
+                label = f'endpoint="{path}"'
+                if family == 'requests_total':
+                    lines.extend(f'{name}{{{label},status="{status}"}} {count}'
+                                 for status, count in sorted(metrics['requests'].items()))
+                elif family == 'errors_total':
+                    lines.extend(f'{name}{{{label},error="{error}"}} {count}'
+                                 for error, count in sorted(metrics['errors'].items()))
+                elif family == 'request_duration_seconds':
+                    latency = metrics['latency']
+                    lines.extend(f'{name}_bucket{{{label},le="{bound}"}} {count}'
+                                 for bound, count in latency['buckets'].items())
+                    lines.append(f'{name}_sum{{{label}}} {latency["sum"]}')
+                    lines.append(f'{name}_count{{{label}}} {latency["count"]}')
+                elif family == 'phase_seconds':
+                    for phase, value in metrics['phases'].items():
+                        lines.append(f'{name}_sum{{{label},phase="{phase}"}} {value["sum"]}')
+                        lines.append(f'{name}_count{{{label},phase="{phase}"}} {value["count"]}')
+                else:
+                    key = {'retries_total': 'retries', 'throttled_total': 'throttled',
+                           'sent_bytes_total': 'bytes_sent',
+                           'received_bytes_total': 'bytes_received'}[family]
+                    lines.append(f'{name}{{{label}}} {metrics[key]}')
+        return '\n'.join(lines) + '\n'
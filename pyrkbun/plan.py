@@ -0,0 +1,248 @@
+"""Reviewable plans of bulk DNS changes
+
+A Plan records the changes a bulk operation would make to a zone, along
+with a fingerprint of the zone they were computed against. Plans can be
+saved, reviewed and applied later; applying checks the fingerprint first
+so a plan is never applied to a zone that has changed since planning.
+
+Example:
+>>> from pyrkbun.plan import make_plan
+>>> plan = make_plan('example.com', desired_records)
+>>> plan.calls, round(plan.estimate())
+(42, 21)
+>>> plan.save('example.com.plan.json')
+"""
+import json
+import math
+import hashlib
+from datetime import datetime, timezone
+from typing import Iterable, Iterator
+from dataclasses import dataclass, field
+
+from .dns import Dns
+from .diff import ZoneDiff, iter_changes, reuse_records, normalise, record_key
+
+# Bulk modes
+MODES: tuple = ('add', 'flush', 'merge', 'replace')
+# Actions sent to the API when a plan is applied
+CHANGES: tuple = ('delete', 'edit', 'create')
+# Order the actions of each bulk mode are applied in, one phase per action.
+# Bulk operations and applied plans both follow this order.
+PHASES: dict = {'add': ('create',),
+                'flush': ('delete', 'create'),
+                'merge': ('create', 'edit'),
+                'replace': ('edit', 'delete', 'create')}
+# Typical seconds taken by a single API call, used for time estimates
+CALL_LATENCY: float = 0.5
+PLAN_VERSION: int = 1
+
+
+class StalePlanError(Exception):
+    '''The zone has changed since a plan was made
+
+    Args:
+    expected: Zone fingerprint recorded in the plan
+    actual: Fingerprint of the zone as it is now
+    '''
+
+    def __init__(self, expected: str, actual: str):
+        self.expected = expected
+        self.actual = actual
+        self.message = ('Zone has changed since the plan was made '
+                        f'(planned {expected[:12]}, now {actual[:12]})')
+        super().__init__(self.message)
+
+
+def zone_fingerprint(records, domain: str) -> str:
+    """Return a hash of the records of a zone, independent of their order"""
+    keys = []
+    for record in records:
+        record = normalise(record, domain)
+        keys.append((record.get('id', ''),) + record_key(record))
+    keys.sort()
+    digest = hashlib.sha256()
+    for key in keys:
+        digest.update(json.dumps(key).encode())
+    return digest.hexdigest()
+
+def without_ns(records: Iterable, domain: str) -> Iterator:
+    """Lazily filter NS records out of records"""
+    return (record for record in records if normalise(record, domain)['type'] != 'NS')
+
+def plan_phases(existing: list, desired: Iterable, domain: str, mode: str = 'merge') -> list:
+    """Lazily compute the changes made by a bulk mode, in phases
+
+    Desired records are consumed as the phases are iterated, so they may be
+    read lazily from a large file. All changes of a phase must be made
+    before those of the next. Phases make their API calls in the order of
+    PHASES, e.g. flush deletes records before creating records that may
+    reuse their names, the same order Plan.phases() applies a plan in.
+
+    Args:
+    existing: Records currently in the zone, as dicts or Dns instances
+    desired: Records provided for the bulk operation
+    domain: Domain of the zone
+    mode (optional): One of MODES. Defaults to 'merge'
+        add: Create all desired records
+        flush: Delete all existing records and create all desired records
+        merge: Edit matched records and create the rest, deleting nothing
+        replace: Make the zone match the desired records with the fewest
+            calls, editing existing records in place where possible and
+            leaving unchanged records untouched
+
+    Returns:
+    List of iterables of (action, record) pairs, with actions from
+    pyrkbun.diff.ACTIONS
+    """
+    if mode not in MODES:
+        raise ValueError(f'Unknown bulk mode {mode!r}')
+    creates = (('create', normalise(record, domain)) for record in desired)
+    if mode == 'add':
+        return [creates]
+    if mode == 'flush':
+        return [(('delete', normalise(record, domain)) for record in existing), creates]
+    changes = iter_changes(existing, desired, domain)
+    # Changes of later phases are held back until all desired records have
+    # been read. Edits and deletes are bounded by the size of the zone, so
+    # only replace holds back changes that grow with the input.
+    pending = ZoneDiff()
+    def held(action):
+        yield from ((action, record) for record in getattr(pending, action))
+    if mode == 'merge':
+        def streamed():
+            for action, record in changes:
+                if action == 'edit':
+                    pending.edit.append(record)
+                elif action != 'delete':
+                    yield action, record
+        return [streamed(), held('edit')]
+    def edited():
+        for action, record in changes:
+            if action in ('create', 'delete'):
+                getattr(pending, action).append(record)
+            else:
+                yield action, record
+        # Deletes paired with creates become edits of the deleted records
+        reuse_records(pending)
+        yield from held('edit')
+    return [edited(), held('delete'), held('create')]
+
+def plan_changes(existing: list, desired: Iterable, domain: str, mode: str = 'merge') -> ZoneDiff:
+    """Compute the changes made by a bulk mode, see plan_phases()"""
+    result = ZoneDiff()
+    for phase in plan_phases(existing, desired, domain, mode):
+        for action, record in phase:
+            getattr(result, action).append(record)
+    return result
+
+
+@dataclass
+class Plan():
+    '''Changes planned for a zone
+
+    Args:
+    domain: Domain of the zone
+    mode: Bulk mode the changes were computed with
+    fingerprint: zone_fingerprint() of the zone when planned
+    changes: ZoneDiff of the planned changes
+    created (optional): ISO 8601 time the plan was made
+    '''
+    domain: str
+    mode: str
+    fingerprint: str
+    changes: ZoneDiff
+    created: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+
+    @property
+    def calls(self) -> int:
+        """Number of API calls made when the plan is applied"""
+        return sum(len(getattr(self.changes, action)) for action in CHANGES)
+
+    def estimate(self, limiter=None, concurrency: int = 1, latency: float = CALL_LATENCY) -> float:
+        """Estimate the seconds taken to apply the plan
+
+        Args:
+        limiter (optional): RateLimiter the calls are subject to. Defaults
+            to the limiter shared by the default clients
+        concurrency (optional): Number of calls run in parallel. Defaults to 1
+        latency (optional): Seconds taken by each call. Defaults to CALL_LATENCY
+        """
+        if limiter is None:
+            # pylint: disable = import-outside-toplevel
+            from .util import RATE_LIMITER
+            limiter = RATE_LIMITER
+        calls = self.calls
+        # Each action is applied as its own batch of parallel calls
+        parallel = sum(math.ceil(len(getattr(self.changes, action)) / max(1, concurrency))
+                       for action in CHANGES) * latency
+        limited = max(0, calls - limiter.burst) / limiter.rate if limiter.rate else 0.0
+        return max(parallel, limited)
+
+    def phases(self) -> list:
+        """Return the planned changes as phases in PHASES order, see plan_phases()"""
+        return [[('ignored', record) for record in self.changes.ignored]] \
+            + [[(action, record) for record in getattr(self.changes, action)]
+               for action in PHASES[self.mode]]
+
+    def check(self, existing) -> None:
+        """Raise StalePlanError if existing records differ from those planned"""
+        fingerprint = zone_fingerprint(existing, self.domain)
+        if fingerprint != self.fingerprint:
+            raise StalePlanError(self.fingerprint, fingerprint)
+
+    def to_dict(self) -> dict:
+        """Return the plan as a JSON serialisable dict"""
+        return {'version': PLAN_VERSION,
+                'domain': self.domain,
+                'mode': self.mode,
+                'fingerprint': self.fingerprint,
+                'created': self.created,
+                'summary': self.changes.summary(),
+                'calls': self.calls,
+                'changes': {action: getattr(self.changes, action)
+                            for action in CHANGES + ('ignored',)}}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Plan':
+        """Create a plan from the output of to_dict()"""
+        if data.get('version') != PLAN_VERSION:
+            raise ValueError(f'Unsupported plan version {data.get("version")!r}')
+        changes = ZoneDiff(**{action: list(records)
+                              for action, records in data['changes'].items()})
+        return cls(data['domain'], data['mode'], data['fingerprint'], changes, data['created'])
+
+    def save(self, path: str) -> None:
+        """Write the plan to a JSON file"""
+        with open(path, 'w', encoding='utf8') as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> 'Plan':
+        """Read a plan written by save()"""
+        with open(path, 'r', encoding='utf8') as file:
+            return cls.from_dict(json.load(file))
+
+
+def make_plan(domain: str,
+              desired: Iterable,
+              mode: str = 'merge',
+              include_ns: bool = False,
+              client=None) -> Plan:
+    """Retrieve a zone and plan a bulk operation on it
+
+    Args:
+    domain: Target domain
+    desired: Records provided for the bulk operation
+    mode (optional): Bulk mode, see plan_changes(). Defaults to 'merge'
+    include_ns (optional): Include NS records in the changes. Defaults to False
+    client (optional): PorkbunClient used to retrieve the zone
+
+    The fingerprint always covers the whole zone, including NS records.
+    """
+    dns = Dns if client is None else client.dns
+    existing = dns.get_records(domain)
+    fingerprint = zone_fingerprint(existing, domain)
+    if not include_ns:
+        existing = without_ns(existing, domain)
+        desired = without_ns(desired, domain)
+    return Plan(domain, mode, fingerprint, plan_changes(existing, desired, domain, mode))
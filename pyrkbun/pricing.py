@@ -1,10 +1,87 @@
 """Porkbun domain pricing API
+
+Pricing data is public and changes rarely, so responses can be kept in a
+persistent cache (see pyrkbun.cache.DiskCache) shared by all processes of
+the user. The cache is opt in: get() and iter_pricing() call the API unless
+given a max_age, e.g. const.PRICING_MAX_AGE as used by the pricing CLI.
+Cached data younger than max_age is served without contacting the API.
+Older data is still served for up to PYRK_PRICING_STALE seconds while a
+fresh copy is retrieved in a background thread.
+
+A PricingTable indexes a pricing response by TLD and holds prices as
+numeric columns for fast filtering and sorting.
 """
-from .util import api_post
+import math
+import heapq
+import threading
+from array import array
+from typing import Iterable, Iterator
+
+import httpx
+
+try:
+    import numpy
+except ModuleNotFoundError:
+    numpy = None
+
+from .util import api_post, api_stream, get_transport
+from .stream import iter_json_items
+from .cache import DiskCache
+from .const import ApiError, ApiFailure, BASE_URL, PRICING_STALE
+
+PATH: str = '/pricing/get'
+PRICING_CACHE = DiskCache('pricing.json')
+
+_REFRESH_LOCK = threading.Lock()
+_REFRESH: dict = {'thread': None}
+
+def _cacheable(client) -> bool:
+    """Only responses from the Porkbun API are cached, not those of simulators
+    or clients of other API endpoints, which would share the cache file"""
+    if client is not None:
+        return client.transport is None and client.base_url == BASE_URL \
+            and get_transport()[0] is None
+    return get_transport()[0] is None
 
-def get() -> dict:
+def _fetch(client, save: bool) -> dict:
+    """Retrieve pricing from the API, updating the cache if requested"""
+    response = api_post(PATH, auth=False, client=client)
+    if save and response.get('status') == 'SUCCESS':
+        PRICING_CACHE.save(response)
+    return response
+
+def _revalidate(client) -> None:
+    """Refresh the cache in a background thread unless a refresh is running"""
+    if not _REFRESH_LOCK.acquire(blocking=False):
+        return
+    def refresh():
+        try:
+            _fetch(client, save=True)
+        except (ApiError, ApiFailure, httpx.HTTPError):
+            # The stale copy continues to be served until the next attempt
+            pass
+        finally:
+            _REFRESH_LOCK.release()
+    try:
+        thread = threading.Thread(target=refresh, name='pyrkbun-pricing-refresh', daemon=True)
+        thread.start()
+    except BaseException:
+        # A thread that never started cannot release the lock
+        _REFRESH_LOCK.release()
+        raise
+    _REFRESH['thread'] = thread
+
+def get(client=None, max_age: float = None, refresh: bool = False) -> dict:
     """Check default domain pricing information for all supported TLDs
 
+    Args:
+    client (optional): PorkbunClient to send the request with
+    max_age (optional): Seconds cached pricing is served without a refresh,
+        e.g. const.PRICING_MAX_AGE. Defaults to None, which like zero retrieves
+        pricing from the API without reading or writing the cache
+    refresh (optional): Retrieve from the API and update the cache even if
+        the cached copy is fresh. Defaults to False
+
     Example:
     >>> import pyrkbun
     >>> response = pyrkbun.pricing.get()
@@ -16,6 +93,291 @@ def get() -> dict:
     'type': 'amount', 'amount': 1}}},
     'xof': {'registration': '6.49', 'renewal': '21.94', ... }
     """
-    path = '/pricing/get'
-    response = api_post(path, auth=False)
-    return response
+    if not max_age or not _cacheable(client):
+        return _fetch(client, save=False)
+    if not refresh:
+        age, cached = PRICING_CACHE.load()
+        if age is not None and age <= max_age:
+            return cached
+        if age is not None and age <= max_age + PRICING_STALE:
+            _revalidate(client)
+            return cached
+    return _fetch(client, save=True)
+
+def iter_pricing(client=None, max_age: float = None, refresh: bool = False) -> Iterator:
+    """Yield (tld, pricing) pairs one at a time without loading the whole list
+
+    Fresh pricing is read incrementally from the pricing cache, otherwise
+    it is decoded incrementally from the API response. Unlike get(), data
+    retrieved here is not written to the cache. Arguments are as for get().
+
+    Example:
+    >>> for tld, price in pyrkbun.pricing.iter_pricing(max_age=3600):
+    ...     print(tld, price['registration'])
+    de 5.55
+    xof 6.49
+    ...
+    """
+    file = None
+    if max_age and not refresh and _cacheable(client):
+        age = PRICING_CACHE.age()
+        if age is not None and age <= max_age:
+            try:
+                file = open(PRICING_CACHE.path, 'rb') # pylint: disable = consider-using-with
+            except OSError:
+                pass
+    if file is None:
+        yield from api_stream(PATH, ('pricing',), auth=False, client=client)
+        return
+    with file:
+        yield from iter_json_items(iter(lambda: file.read(65536), b''), ('pricing',))
+
+
+class PricingTable():
+    '''Pricing data indexed by TLD with numeric price columns
+
+    Args:
+    api_response: Response from pricing.get(), or its 'pricing' dict
+    use_numpy (optional): Hold columns as NumPy arrays and evaluate queries
+        vectorised. Defaults to True when NumPy is installed
+
+    Usage:
+    Prices are parsed once into float columns ('registration', 'renewal'
+    and 'transfer'), backed by array.array (or NumPy arrays). Prices that
+    are missing or cannot be parsed are NaN and never match a filter.
+
+    Filters take price bounds as keyword arguments named after a column,
+    either a maximum or a (minimum, maximum) tuple with None for an open
+    bound. Minimums are inclusive and maximums exclusive, so renewal=10
+    selects TLDs renewing for less than 10.
+
+    Example:
+    >>> table = PricingTable.load(max_age=3600)
+    >>> table['com']
+    {'tld': 'com', 'registration': 9.68, 'renewal': 9.68, 'transfer': 9.68, 'coupons': {}}
+    >>> table.cheapest(3, renewal=5)
+    [('xyz', 1.03), ('top', 1.55), ('click', 2.06)]
+    >>> table.filter(coupons=True)
+    ['de', 'com', ... ]
+    '''
+
+    columns: tuple = ('registration', 'renewal', 'transfer')
+
+    def __init__(self, api_response: dict, use_numpy: bool = True):
+        pricing: dict = api_response.get('pricing', api_response) \
+            if 'status' in api_response else api_response
+        self.tlds: list = list(pricing)
+        self._index: dict = {tld: row for row, tld in enumerate(self.tlds)}
+        self.coupons: list = [pricing[tld].get('coupons') or {} for tld in self.tlds]
+        self._data: dict = {column: array('d', (self._price(pricing[tld].get(column))
+                                                for tld in self.tlds))
+                            for column in self.columns}
+        self._data['coupons'] = array('b', (bool(coupons) for coupons in self.coupons))
+        self._trie: dict = None
+        self.numpy: bool = bool(use_numpy and numpy is not None)
+        if self.numpy:
+            # Zero copy views of the parsed arrays
+            self._data = {column: numpy.frombuffer(self._data[column], dtype=numpy.float64)
+                          for column in self.columns} \
+                | {'coupons': numpy.frombuffer(self._data['coupons'], dtype=numpy.int8) != 0}
+
+    @classmethod
+    def load(cls, client=None, max_age: float = None, refresh: bool = False) -> 'PricingTable':
+        """Build a table from pricing.get(), see it for details of arguments"""
+        return cls(get(client, max_age, refresh))
+
+    @staticmethod
+    def _price(value) -> float:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return math.nan
+
+    def __len__(self) -> int:
+        return len(self.tlds)
+
+    def __contains__(self, tld: str) -> bool:
+        return tld.lower().lstrip('.') in self._index
+
+    def _row(self, tld: str) -> int:
+        return self._index[tld.lower().lstrip('.')]
+
+    def __iter__(self):
+        return iter(self.tlds)
+
+    def __getitem__(self, tld: str) -> dict:
+        row = self._row(tld)
+        result = {'tld': self.tlds[row]}
+        result.update({column: float(self._data[column][row]) for column in self.columns})
+        result['coupons'] = self.coupons[row]
+        return result
+
+    def column(self, name: str):
+        """Return a price column as an array, indexed in the order of tlds"""
+        if name not in self.columns:
+            raise KeyError(f'Unknown pricing column: {name}')
+        return self._data[name]
+
+    def price(self, tld: str, column: str = 'registration') -> float:
+        """Return a single price of a TLD"""
+        return float(self.column(column)[self._row(tld)])
+
+    def _rows(self, coupons: bool, bounds: dict):
+        """Return the rows matching the filters, as an index array or list"""
+        limits = {}
+        for column, bound in bounds.items():
+            self.column(column)
+            low, high = bound if isinstance(bound, tuple) else (None, bound)
+            limits[column] = (-math.inf if low is None else low,
+                              math.inf if high is None else high)
+        if self.numpy:
+            mask = numpy.ones(len(self.tlds), dtype=bool)
+            for column, (low, high) in limits.items():
+                values = self._data[column]
+                mask &= (values >= low) & (values < high)
+            if coupons is not None:
+                mask &= self._data['coupons'] == coupons
+            return numpy.flatnonzero(mask)
+        rows = range(len(self.tlds))
+        for column, (low, high) in limits.items():
+            values = self._data[column]
+            rows = [row for row in rows if low <= values[row] < high]
+        if coupons is not None:
+            flags = self._data['coupons']
+            rows = [row for row in rows if bool(flags[row]) == coupons]
+        return rows
+
+    def filter(self, coupons: bool = None, **bounds) -> list:
+        """Return the TLDs within the price bounds, in table order
+
+        Args:
+        coupons (optional): True for TLDs with active coupons, False for
+            TLDs without. Defaults to either
+        **bounds: Price bounds keyed by column name
+        """
+        return [self.tlds[row] for row in self._rows(coupons, bounds)]
+
+    def sort(self, by: str = 'registration', descending: bool = False,
+             coupons: bool = None, **bounds) -> list:
+        """Return the matching TLDs ordered by a price column
+
+        TLDs without a price in the sort column are placed last.
+        """
+        values = self.column(by)
+        rows = self._rows(coupons, bounds)
+        if self.numpy:
+            keys = values[rows]
+            order = numpy.argsort(-keys if descending else keys, kind='stable')
+            return [self.tlds[row] for row in rows[order]]
+        priced = [row for row in rows if not math.isnan(values[row])]
+        ordered = sorted(priced, key=values.__getitem__, reverse=descending)
+        ordered.extend(row for row in rows if math.isnan(values[row]))
+        return [self.tlds[row] for row in ordered]
+
+    def cheapest(self, count: int = 10, by: str = 'registration',
+                 coupons: bool = None, **bounds) -> list:
+        """Return up to count (tld, price) pairs with the lowest prices
+
+        Args:
+        count (optional): Number of TLDs to return. Defaults to 10
+        by (optional): Price column to rank by. Defaults to 'registration'
+        coupons (optional): Restrict to TLDs with or without coupons
+        **bounds: Price bounds keyed by column name
+        """
+        values = self.column(by)
+        rows = self._rows(coupons, {by: (None, None), **bounds})
+        if self.numpy:
+            if count < len(rows):
+                rows = rows[numpy.argpartition(values[rows], count)[:count]]
+            rows = rows[numpy.argsort(values[rows], kind='stable')]
+            return [(self.tlds[row], float(values[row])) for row in rows]
+        rows = heapq.nsmallest(count, rows, key=values.__getitem__)
+        return [(self.tlds[row], values[row]) for row in rows]
+
+    def _suffix_trie(self) -> dict:
+        """Return the trie of TLD labels in reverse order, building it on first use
+
+        Each node maps a label to its child node, with the row of the TLD
+        ending at that node held under the None key.
+        """
+        if self._trie is None:
+            trie: dict = {}
+            for row, tld in enumerate(self.tlds):
+                node = trie
+                for label in reversed(tld.split('.')):
+                    node = node.setdefault(label, {})
+                node[None] = row
+            self._trie = trie
+        return self._trie
+
+    def _match(self, labels: list) -> int:
+        """Return the row of the longest TLD suffix of domain labels, or None
+
+        At least one label is left in front of the TLD, so a bare TLD such
+        as co.uk matches uk rather than itself.
+        """
+        node, row = self._suffix_trie(), None
+        for position in range(len(labels) - 1, 0, -1):
+            node = node.get(labels[position])
+            if node is None:
+                break
+            row = node.get(None, row)
+        return row
+
+    def tld_of(self, domain: str) -> str:
+        """Return the longest priced TLD of a domain name, or None
+
+        Example:
+        >>> table.tld_of('www.example.co.uk')
+        'co.uk'
+        """
+        row = self._match(domain.strip().rstrip('.').lower().split('.'))
+        return None if row is None else self.tlds[row]
+
+    def quote(self, domains: Iterable, columns: tuple = ('registration', 'renewal')) -> Iterator:
+        """Yield the prices of each domain name as it is read from domains
+
+        Domains are matched to their longest TLD suffix using a trie of
+        reversed TLD labels, so the cost per domain depends only on its
+        number of labels. Results are yielded in input order, so domains
+        may be a lazily produced iterable of any length.
+
+        Args:
+        domains: Iterable of domain names
+        columns (optional): Price columns to include in each result.
+            Defaults to registration and renewal
+
+        Yields:
+        dict: The domain, its matched 'tld' and the requested prices. For
+            domains without a priced TLD the tld and prices are None
+
+        Example:
+        >>> list(table.quote(['example.co.uk', 'example.invalid']))
+        [{'domain': 'example.co.uk', 'tld': 'co.uk', 'registration': 4.39, 'renewal': 4.39},
+         {'domain': 'example.invalid', 'tld': None, 'registration': None, 'renewal': None}]
+        """
+        values = [(column, self.column(column)) for column in columns]
+        for domain in domains:
+            row = self._match(domain.strip().rstrip('.').lower().split('.'))
+            if row is None:
+                result = {'domain': domain, 'tld': None}
+                result.update((column, None) for column, _ in values)
+            else:
+                result = {'domain': domain, 'tld': self.tlds[row]}
+                result.update((column, float(data[row])) for column, data in values)
+            yield result
+
+def quote(domains: Iterable, client=None) -> Iterator:
+    """Yield registration and renewal prices for domain names
+
+    Convenience wrapper building a PricingTable from pricing.get(), see
+    PricingTable.quote for details.
+
+    Example:
+    >>> import pyrkbun
+    >>> for result in pyrkbun.pricing.quote(['example.com', 'example.co.uk']):
+    ...     print(result)
+    {'domain': 'example.com', 'tld': 'com', 'registration': 9.68, 'renewal': 9.68}
+    {'domain': 'example.co.uk', 'tld': 'co.uk', 'registration': 4.39, 'renewal': 4.39}
+    """
+    return PricingTable.load(client).quote(domains)
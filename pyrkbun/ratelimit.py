@@ -0,0 +1,140 @@
+"""Request rate limiting
+"""
+import time
+import asyncio
+import threading
+
+
+class RateLimiter(): # pylint: disable = too-many-instance-attributes
+    '''Adaptive token bucket rate limiter shared across threads and async tasks
+
+    Args:
+    rate: Sustained number of requests permitted per second.
+        A rate of zero (or None) disables rate limiting.
+    burst (optional): Number of requests that may be sent back to back
+        once the bucket has filled during idle time. Defaults to 1
+
+    Usage:
+    Call acquire() (or await acquire_async() from a coroutine) before each
+    request. Tokens are reserved under a lock, so the limit holds globally
+    no matter how many threads or tasks share the limiter.
+
+    When the API signals throttling call throttle() to pause all callers
+    and halve the effective rate. Each subsequent call to recover() raises
+    the effective rate again until the configured rate is restored.
+
+    Example:
+    >>> limiter = RateLimiter(2, burst=5)
+    >>> limiter.acquire()
+    0.0
+    '''
+
+    # Lowest rate an adaptive slowdown will reduce to (requests per second)
+    min_rate: float = 0.1
+    # Multiplier applied to the effective rate for each recovered request
+    recovery_factor: float = 1.05
+
+    def __init__(self, rate: float, burst: int = 1):
+        self._lock = threading.Lock()
+        self.rate: float = 0.0
+        self.burst: int = 1
+        self._tokens: float = 0.0
+        self._updated: float = time.monotonic()
+        self._effective: float = None
+        self._target: float = None
+        self._last: float = None
+        self._interval: float = None
+        self.configure(rate, burst)
+
+    @classmethod
+    def from_interval(cls, interval: float, burst: int = 1) -> 'RateLimiter':
+        """Create limiter from a minimum interval in seconds between requests"""
+        return cls(1 / interval if interval else 0, burst)
+
+    def __repr__(self) -> str:
+        return f'RateLimiter(rate={self.rate}, burst={self.burst})'
+
+    @property
+    def effective_rate(self) -> float:
+        """Current rate in requests per second after any adaptive slowdown"""
+        return self._effective if self._effective is not None else self.rate
+
+    def configure(self, rate: float, burst: int = 1) -> None:
+        """Change the limiter rate and burst size, starting with a full bucket"""
+        if burst < 1:
+            raise ValueError('burst must be at least 1')
+        with self._lock:
+            self.rate = float(rate) if rate else 0.0
+            self.burst = int(burst)
+            self._tokens = float(self.burst)
+            self._updated = time.monotonic()
+            self._effective = None
+            self._target = None
+
+    def _reserve(self) -> float:
+        """Reserve a token and return the seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            if self._last is not None:
+                # Track the observed request interval so an unlimited bucket
+                # has a starting point to slow down from when throttled
+                gap = now - self._last
+                self._interval = gap if self._interval is None \
+                    else 0.8 * self._interval + 0.2 * gap
+            self._last = now
+            # The bucket may be paused until a time in the future
+            paused = max(0.0, self._updated - now)
+            rate = self.effective_rate
+            if not rate:
+                return paused
+            if not paused:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * rate)
+                self._updated = now
+            self._tokens -= 1
+            # A negative balance is a reservation against future refills,
+            # later callers queue behind it.
+            return paused + (-self._tokens / rate if self._tokens < 0 else 0.0)
+
+    def acquire(self) -> float:
+        """Block until a request may be sent, returning the seconds waited"""
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        """Wait without blocking the event loop until a request may be sent"""
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+    def throttle(self, pause: float = 0.0) -> None:
+        """Slow down after the API signalled throttling
+
+        Args:
+        pause (optional): Seconds all callers should wait before the next
+            request, typically taken from a Retry-After header
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._target is None:
+                observed = 1 / self._interval if self._interval else 1.0
+                self._target = self.rate or observed
+            current = self._effective or self.rate or self._target
+            self._effective = max(current / 2, self.min_rate)
+            # Drop any accumulated burst so callers resume at the slower rate
+            self._tokens = min(self._tokens, 1.0)
+            self._updated = max(self._updated, now + pause)
+
+    def recover(self) -> None:
+        """Raise the effective rate after a successful request"""
+        if self._effective is None:
+            return
+        with self._lock:
+            if self._effective is None:
+                return
+            self._effective *= self.recovery_factor
+            if self._effective >= self._target:
+                self._effective = None
+                self._target = None
@@ -0,0 +1,144 @@
+"""Retry and backoff helpers for API requests
+
+Endpoints are grouped into classes by how safe they are to repeat, and each
+class has its own retry policy:
+
+read: Retrieval endpoints with no side effects. Retried on any transport
+    error, throttling or server error response.
+write: Edit and delete endpoints. Repeating them has the same effect, but
+    a repeat after an ambiguous failure will usually be rejected by the
+    API, so they are only retried when the request was never processed.
+create: Record creation. Repeating a processed create makes a duplicate
+    record, so it is only retried when the request was never processed.
+    After an ambiguous failure (e.g. a read timeout or a 500, 502 or 504
+    response) the record is looked up by name and type instead of resending
+    the create.
+"""
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+from .const import BACKOFF_BASE, BACKOFF_MAX, STATUS_RETRIES, READ_RETRIES
+
+# HTTP status codes returned by the API when it is throttling requests
+THROTTLE_HTTP_RESPONSE: set = {429, 503}
+# HTTP status codes worth retrying for requests that are safe to repeat
+TRANSIENT_HTTP_RESPONSE: set = THROTTLE_HTTP_RESPONSE | {500, 502, 504}
+# HTTP status codes returned when a request may or may not have been processed
+AMBIGUOUS_HTTP_RESPONSE: set = TRANSIENT_HTTP_RESPONSE - THROTTLE_HTTP_RESPONSE
+# Transport errors raised before the request could have reached the API
+UNSENT_ERRORS: tuple = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+ENDPOINT_CLASSES: dict = {'/dns/retrieve': 'read',
+                          '/dns/retrieveByNameType': 'read',
+                          '/ping': 'read',
+                          '/pricing/get': 'read',
+                          '/ssl/retrieve': 'read',
+                          '/dns/edit': 'write',
+                          '/dns/editByNameType': 'write',
+                          '/dns/delete': 'write',
+                          '/dns/deleteByNameType': 'write',
+                          '/dns/create': 'create'}
+
+
+@dataclass
+class RetryPolicy():
+    '''Retry policy applied to an API request
+
+    Args:
+    retries: Maximum number of times a request is resent
+    statuses (optional): HTTP status codes that trigger a retry.
+        Defaults to throttling responses (429 and 503)
+    errors (optional): Transport errors that trigger a retry.
+        Defaults to errors raised before the request was sent
+    reconcile (optional): Look up a record after an ambiguous create
+        failure (a transport error not in errors, or a 500, 502 or 504
+        response) rather than resending the create. Defaults to False.
+        If the record is not found the create is resent while retries
+        remain. A create processed by the API but not yet visible to the
+        lookup is then made twice, so set retries to 0 where a duplicate
+        record is worse than a failed create.
+    '''
+    retries: int
+    statuses: frozenset = frozenset(THROTTLE_HTTP_RESPONSE)
+    errors: tuple = UNSENT_ERRORS
+    reconcile: bool = False
+
+
+RETRY_POLICIES: dict = {'read': RetryPolicy(READ_RETRIES,
+                                            frozenset(TRANSIENT_HTTP_RESPONSE),
+                                            (httpx.TransportError,)),
+                        'write': RetryPolicy(STATUS_RETRIES),
+                        'create': RetryPolicy(STATUS_RETRIES, reconcile=True)}
+
+def endpoint(path: str) -> str:
+    """Return the API endpoint of a request path without its arguments
+
+    Example:
+    >>> endpoint('/dns/retrieveByNameType/example.com/A/www')
+    '/dns/retrieveByNameType'
+    """
+    parts = [part for part in path.split('/') if part]
+    if parts[:1] == ['ping']:
+        return '/ping'
+    return '/' + '/'.join(parts[:2])
+
+def endpoint_class(path: str) -> str:
+    """Return the retry class of a request path, defaulting to 'write'"""
+    return ENDPOINT_CLASSES.get(endpoint(path), 'write')
+
+def policy_for(path: str) -> RetryPolicy:
+    """Return the retry policy configured for a request path"""
+    return RETRY_POLICIES[endpoint_class(path)]
+
+def reconcile_path(path: str, payload: dict) -> str:
+    """Build the lookup path used to reconcile an ambiguous create"""
+    domain = [part for part in path.split('/') if part][2]
+    return f'/dns/retrieveByNameType/{domain}/{payload.get("type")}/{payload.get("name") or ""}'
+
+def reconcile_match(path: str, payload: dict, api_response: dict) -> dict:
+    """Find the record matching a create payload in a lookup response
+
+    Returns a response equivalent to a successful create if a record with
+    the same name, type and content exists, otherwise None.
+    """
+    domain = [part for part in path.split('/') if part][2]
+    name = payload.get('name') or ''
+    name = name if name == domain or name.endswith(f'.{domain}') \
+        else f'{name}.{domain}' if name else domain
+    for record in api_response.get('records', []):
+        if record['name'] == name and record['type'] == payload.get('type') \
+                and record['content'] == payload.get('content'):
+            return {'status': 'SUCCESS', 'id': int(record['id'])}
+    return None
+
+def retry_after(response: httpx.Response) -> float:
+    """Return the delay in seconds requested by a Retry-After header
+
+    Both delay-seconds and HTTP-date forms are supported. Returns 0 if the
+    header is missing or cannot be parsed.
+    """
+    value: str = response.headers.get('retry-after')
+    if not value:
+        return 0.0
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, OverflowError):
+        return 0.0
+
+def backoff_delay(attempt: int, minimum: float = 0.0) -> float:
+    """Exponential backoff with full jitter for a zero based retry attempt
+
+    The delay is drawn between zero and BACKOFF_BASE * 2^attempt (capped
+    at BACKOFF_MAX) and is never less than minimum, which allows a server
+    provided Retry-After value to take precedence.
+    """
+    ceiling = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+    return max(minimum, random.uniform(0, ceiling))
@@ -0,0 +1,394 @@
+"""Offline Porkbun API simulator
+
+An in-process stand in for the Porkbun API used for tests and benchmarks.
+It implements the DNS, SSL, pricing and ping endpoints with the same JSON
+shapes as the live API, and can inject latency, throttling and errors.
+
+Usage:
+Install a simulator as the transport used by all pyrkbun API calls, or set
+the PYRK_SIMULATOR environment variable to use a default simulator.
+
+Example:
+>>> import pyrkbun
+>>> from pyrkbun.simulator import PorkbunSimulator
+>>> sim = PorkbunSimulator(latency=0.05, throttle_rate=0.01)
+>>> sim.install()
+>>> pyrkbun.dns.create_record('example.com', {'name': 'www', 'type': 'A',
+...                                          'content': '198.51.100.45'})
+{'status': 'SUCCESS', 'id': 100000005}
+>>> sim.uninstall()
+"""
+import time
+import json
+import random
+import asyncio
+import threading
+from functools import lru_cache
+from typing import Iterable
+
+import httpx
+
+from .const import SUPPORTED_DNS_RECORD_TYPES
+
+DEFAULT_NAMESERVERS: tuple = ('curitiba.ns.porkbun.com',
+                              'fortaleza.ns.porkbun.com',
+                              'maceio.ns.porkbun.com',
+                              'salvador.ns.porkbun.com')
+
+PRICING_TLDS: tuple = ('com', 'net', 'org', 'io', 'dev', 'app', 'co', 'me', 'info', 'biz',
+                       'xyz', 'online', 'site', 'tech', 'store', 'shop', 'blog', 'cloud',
+                       'de', 'fr', 'nl', 'eu', 'us', 'ca', 'ch', 'at', 'be', 'es', 'it',
+                       'uk', 'co.uk', 'org.uk', 'me.uk', 'au', 'com.au', 'net.au', 'nz',
+                       'co.nz', 'in', 'co.in', 'jp', 'br', 'com.br', 'mx', 'com.mx', 'ai',
+                       'gg', 'tv', 'fm', 'ly', 'sh', 'to', 'ws', 'cc', 'pw', 'lol', 'wtf',
+                       'ninja', 'rocks', 'page', 'email', 'link', 'click', 'design', 'art')
+
+PEM_BLOCK: str = '-----BEGIN {0}-----\nU0lNVUxBVEVE\n-----END {0}-----\n'
+
+
+def _error(http_status: int, message: str) -> httpx.Response:
+    """Build an API error response"""
+    return httpx.Response(http_status, json={'status': 'ERROR', 'message': message})
+
+
+class PorkbunSimulator(): # pylint: disable = too-many-instance-attributes
+    '''In-process simulation of the Porkbun API
+
+    Args:
+    latency (optional): Seconds added to every response. Defaults to 0
+    jitter (optional): Maximum random seconds added to latency. Defaults to 0
+    throttle_rate (optional): Probability of a request being rejected with
+        http status 429. Defaults to 0
+    rate_limit (optional): Requests per second accepted before further
+        requests are rejected with http status 429. Defaults to unlimited
+    retry_after (optional): Retry-After header value in seconds returned
+        with throttled responses. Defaults to 1
+    error_rate (optional): Probability of a request failing with a non-json
+        http status 500 response. Defaults to 0
+    api_key, secret_key (optional): Credentials required for authenticated
+        endpoints. Any credentials are accepted when not set
+    auto_create (optional): Create unknown domains on first use with
+        default NS records. Defaults to True
+    pricing_tlds (optional): Number of TLDs returned by the pricing
+        endpoint. Defaults to 500
+    seed (optional): Seed for the random generator used for injected
+        failures and generated pricing data
+
+    Attributes:
+    zones: Records of each domain held as {domain: {record_id: record}}
+        where each record uses the API response format
+    requests: Count of requests received per endpoint path prefix
+    '''
+
+    # pylint: disable = too-many-arguments
+    def __init__(self,
+                 latency: float = 0.0,
+                 jitter: float = 0.0,
+                 throttle_rate: float = 0.0,
+                 rate_limit: float = None,
+                 retry_after: float = 1,
+                 error_rate: float = 0.0,
+                 api_key: str = None,
+                 secret_key: str = None,
+                 auto_create: bool = True,
+                 pricing_tlds: int = 500,
+                 seed: int = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self.api_key = api_key
+        self.secret_key = secret_key
+        self.auto_create = auto_create
+        self.zones: dict = {}
+        self.requests: dict = {}
+        self._random = random.Random(seed)
+        self._pricing: dict = self._build_pricing(pricing_tlds)
+        self._next_id: int = 100000000
+        self._lock = threading.Lock()
+        self._window_start: float = time.monotonic()
+        self._window_count: int = 0
+        self._installed: tuple = None
+
+    def _build_pricing(self, count: int) -> dict:
+        """Generate pricing data for count TLDs"""
+        tlds = list(PRICING_TLDS[:count])
+        tlds.extend(f'tld{number}' for number in range(count - len(tlds)))
+        pricing = {}
+        for tld in tlds:
+            registration = round(self._random.uniform(1, 80), 2)
+            renewal = round(registration * self._random.uniform(1, 1.6), 2)
+            entry = {'registration': f'{registration:.2f}',
+                     'renewal': f'{renewal:.2f}',
+                     'transfer': f'{renewal:.2f}',
+                     'coupons': []}
+            if self._random.random() < 0.05:
+                entry['coupons'] = {'registration': {'code': 'AWESOMENESS',
+                                                     'max_per_user': 1,
+                                                     'first_year_only': 'yes',
+                                                     'type': 'amount',
+                                                     'amount': 1}}
+            pricing[tld] = entry
+        return pricing
+
+    def add_domain(self, domain: str, records: Iterable[dict] = ()) -> None:
+        """Add a domain with default NS records and optional extra records
+
+        Records are provided in the create payload format, i.e. with keys
+        name, type, content and optionally ttl, prio and notes.
+        """
+        with self._lock:
+            self._add_zone(domain)
+            for record in records:
+                self._create(domain, record)
+
+    def _add_zone(self, domain: str) -> None:
+        """Create an empty zone holding the default NS records"""
+        self.zones[domain] = {}
+        for nameserver in DEFAULT_NAMESERVERS:
+            self._create(domain, {'name': '', 'type': 'NS', 'content': nameserver,
+                                  'ttl': '86400'})
+
+    def records(self, domain: str) -> list:
+        """Return a copy of the records currently held for domain"""
+        with self._lock:
+            return [dict(record) for record in self.zones.get(domain, {}).values()]
+
+    def transport(self) -> httpx.MockTransport:
+        """Return a transport for use with httpx.Client"""
+        return httpx.MockTransport(self.handle)
+
+    def async_transport(self) -> httpx.MockTransport:
+        """Return a transport for use with httpx.AsyncClient"""
+        return httpx.MockTransport(self.ahandle)
+
+    def install(self) -> 'PorkbunSimulator':
+        """Route all pyrkbun API calls in this process to the simulator"""
+        from . import util # pylint: disable = import-outside-toplevel
+        self._installed = util.get_transport()
+        util.set_transport(self.transport(), self.async_transport())
+        return self
+
+    def uninstall(self) -> None:
+        """Restore the transports in use before install() was called"""
+        from . import util # pylint: disable = import-outside-toplevel
+        util.set_transport(*(self._installed or (None, None)))
+        self._installed = None
+
+    def __enter__(self) -> 'PorkbunSimulator':
+        return self.install()
+
+    def __exit__(self, *exc_info) -> None:
+        self.uninstall()
+
+    def _delay(self) -> float:
+        """Seconds of simulated latency for a response"""
+        return self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        """Handle a request, blocking for any simulated latency"""
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+        return self.respond(request)
+
+    async def ahandle(self, request: httpx.Request) -> httpx.Response:
+        """Handle a request without blocking the event loop"""
+        delay = self._delay()
+        if delay:
+            await asyncio.sleep(delay)
+        return self.respond(request)
+
+    def _throttled(self) -> bool:
+        """Check injected and rate based throttling for a new request"""
+        if self.throttle_rate and self._random.random() < self.throttle_rate:
+            return True
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        if now - self._window_start >= 1:
+            self._window_start = now
+            self._window_count = 0
+        self._window_count += 1
+        return self._window_count > self.rate_limit
+
+    def respond(self, # pylint: disable = too-many-return-statements
+                request: httpx.Request) -> httpx.Response:
+        """Produce the API response for a request"""
+        parts = request.url.path.split('/json/v3/', 1)[-1].strip('/').split('/')
+        endpoint = '/'.join(parts[:1] if parts[0] == 'ping' else parts[:2])
+        args = parts[2:] if parts[0] != 'ping' else []
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            if self._throttled():
+                response = _error(429, 'Rate limit exceeded.')
+                response.headers['retry-after'] = str(self.retry_after)
+                return response
+            if self.error_rate and self._random.random() < self.error_rate:
+                return httpx.Response(500, text='<html><body>Internal Server Error</body></html>')
+            if request.method != 'POST':
+                return _error(405, 'All HTTP request must use POST.')
+            try:
+                payload: dict = json.loads(request.content or b'{}')
+            except ValueError:
+                return _error(400, 'Invalid JSON payload.')
+            if endpoint == 'pricing/get':
+                return httpx.Response(200, json={'status': 'SUCCESS', 'pricing': self._pricing})
+            if not self._authorised(payload):
+                return _error(400, 'Invalid API key. (002)')
+            if endpoint == 'ping':
+                ip_address = '198.51.100.45' if request.url.host.startswith('api-ipv4') \
+                    else '2001:db8:85a3::8a2e:370:7334'
+                return httpx.Response(200, json={'status': 'SUCCESS', 'yourIp': ip_address})
+            handler = self._handlers().get(endpoint)
+            if handler is None or not args:
+                return _error(404, 'Invalid endpoint.')
+            domain = args[0]
+            if domain not in self.zones:
+                if not self.auto_create:
+                    return _error(400, 'Invalid domain.')
+                self._add_zone(domain)
+            return handler(domain, args[1:], payload)
+
+    def _authorised(self, payload: dict) -> bool:
+        """Check request credentials"""
+        if self.api_key is None and self.secret_key is None:
+            return True
+        return payload.get('apikey') == self.api_key \
+            and payload.get('secretapikey') == self.secret_key
+
+    def _handlers(self) -> dict:
+        return {'dns/create': self._dns_create,
+                'dns/edit': self._dns_edit,
+                'dns/editByNameType': self._dns_edit_by_name_type,
+                'dns/delete': self._dns_delete,
+                'dns/deleteByNameType': self._dns_delete_by_name_type,
+                'dns/retrieve': self._dns_retrieve,
+                'dns/retrieveByNameType': self._dns_retrieve_by_name_type,
+                'ssl/retrieve': self._ssl_retrieve}
+
+    @staticmethod
+    def _fqdn(domain: str, name: str) -> str:
+        """Qualify a record name with its domain as the API does"""
+        name = (name or '').strip().lower().rstrip('.')
+        if not name or name == domain:
+            return domain
+        return name if name.endswith(f'.{domain}') else f'{name}.{domain}'
+
+    def _create(self, domain: str, payload: dict) -> str:
+        """Create a record, returning its ID"""
+        self._next_id += 1
+        record_id = str(self._next_id)
+        self.zones[domain][record_id] = {'id': record_id,
+                                         'name': self._fqdn(domain, payload.get('name')),
+                                         'type': payload['type'],
+                                         'content': payload['content'],
+                                         'ttl': str(payload.get('ttl') or '600'),
+                                         'prio': str(payload.get('prio') or '0'),
+                                         'notes': payload.get('notes') or ''}
+        return record_id
+
+    @staticmethod
+    def _validate(payload: dict) -> str:
+        """Return an error message for an invalid create or edit payload"""
+        if payload.get('type') not in SUPPORTED_DNS_RECORD_TYPES:
+            return 'Invalid type passed'
+        if not payload.get('content'):
+            return 'Content is required'
+        try:
+            if payload.get('ttl') and int(payload['ttl']) < 600:
+                return 'TTL must be at least 600'
+        except ValueError:
+            return 'Invalid TTL'
+        return None
+
+    def _dns_create(self, # pylint: disable = unused-argument
+                    domain: str, args: list, payload: dict) -> httpx.Response:
+        message = self._validate(payload)
+        if message:
+            return _error(400, f'Create error: {message}.')
+        record_id = self._create(domain, payload)
+        return httpx.Response(200, json={'status': 'SUCCESS', 'id': int(record_id)})
+
+    def _dns_edit(self, domain: str, args: list, payload: dict) -> httpx.Response:
+        record = self.zones[domain].get(args[0]) if args else None
+        if record is None:
+            return _error(400, 'Invalid record ID.')
+        message = self._validate(payload)
+        if message:
+            return _error(400, f'Edit error: {message}.')
+        updated = {'id': record['id'],
+                   'name': self._fqdn(domain, payload.get('name')),
+                   'type': payload['type'],
+                   'content': payload['content'],
+                   'ttl': str(payload.get('ttl') or '600'),
+                   'prio': str(payload.get('prio') or '0'),
+                   'notes': payload.get('notes') or ''}
+        if updated == record:
+            return _error(400, 'Edit error: We were unable to edit the DNS record.')
+        record.update(updated)
+        return httpx.Response(200, json={'status': 'SUCCESS'})
+
+    def _match(self, domain: str, args: list) -> list:
+        """Return records matching type and optional subdomain arguments"""
+        record_type = args[0] if args else None
+        name = self._fqdn(domain, args[1]) if len(args) > 1 else None
+        return [record for record in self.zones[domain].values()
+                if record['type'] == record_type and (name is None or record['name'] == name)]
+
+    def _dns_edit_by_name_type(self, domain: str, args: list, payload: dict) -> httpx.Response:
+        matched = self._match(domain, args[:2] if len(args) > 1 else args + [''])
+        if not matched or not payload.get('content'):
+            return _error(400, 'Edit error: We were unable to edit the DNS record.')
+        for record in matched:
+            record['content'] = payload['content']
+            record['ttl'] = str(payload.get('ttl') or '600')
+            record['prio'] = str(payload.get('prio') or '0')
+            record['notes'] = payload.get('notes') or ''
+        return httpx.Response(200, json={'status': 'SUCCESS'})
+
+    def _dns_delete(self, # pylint: disable = unused-argument
+                    domain: str, args: list, payload: dict) -> httpx.Response:
+        if not args or self.zones[domain].pop(args[0], None) is None:
+            return _error(400, 'Invalid record ID.')
+        return httpx.Response(200, json={'status': 'SUCCESS'})
+
+    def _dns_delete_by_name_type(self, # pylint: disable = unused-argument
+                                 domain: str, args: list, payload: dict) -> httpx.Response:
+        matched = self._match(domain, args[:2] if len(args) > 1 else args + [''])
+        if not matched:
+            return _error(400, 'Delete error: No records found.')
+        for record in matched:
+            del self.zones[domain][record['id']]
+        return httpx.Response(200, json={'status': 'SUCCESS'})
+
+    def _dns_retrieve(self, # pylint: disable = unused-argument
+                      domain: str, args: list, payload: dict) -> httpx.Response:
+        records = self.zones[domain]
+        if args:
+            records = {args[0]: records[args[0]]} if args[0] in records else {}
+        return httpx.Response(200, json={'status': 'SUCCESS',
+                                         'records': [dict(record) for record in records.values()]})
+
+    def _dns_retrieve_by_name_type(self, # pylint: disable = unused-argument
+                                   domain: str, args: list, payload: dict) -> httpx.Response:
+        records = self._match(domain, args)
+        return httpx.Response(200, json={'status': 'SUCCESS',
+                                         'records': [dict(record) for record in records]})
+
+    def _ssl_retrieve(self, # pylint: disable = unused-argument
+                      domain: str, args: list, payload: dict) -> httpx.Response:
+        certificate = PEM_BLOCK.format('CERTIFICATE')
+        return httpx.Response(200, json={'status': 'SUCCESS',
+                                         'intermediatecertificate': certificate,
+                                         'certificatechain': certificate,
+                                         'privatekey': PEM_BLOCK.format('PRIVATE KEY'),
+                                         'publickey': PEM_BLOCK.format('PUBLIC KEY')})
+
+
+@lru_cache(maxsize=None)
+def default_simulator() -> PorkbunSimulator:
+    """Return the process wide simulator used when PYRK_SIMULATOR is set"""
+    return PorkbunSimulator()
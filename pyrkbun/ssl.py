@@ -2,9 +2,13 @@
 """
 from .util import api_post
 
-def get(domain):
+def get(domain, client=None):
     """Retrieve the SSL certificate bundle for the domain.
-    
+
+    Args:
+    domain: Domain to retrieve the certificate bundle for
+    client (optional): PorkbunClient to send the request with
+
     Example:
     >>> import pyrkbun
     >>> response = pyrkbun.ssl.get('example.com')
@@ -16,5 +20,5 @@ def get(domain):
 	"publickey": "<cert-data>"}
     """
     path = f'/ssl/retrieve/{domain}'
-    response = api_post(path)
+    response = api_post(path, client=client)
     return response
@@ -0,0 +1,169 @@
+"""Incremental JSON decoding
+
+Large API responses (DNS retrievals of big zones and the pricing list) can
+be decoded one entry at a time as their bytes arrive instead of holding the
+whole document and its decoded form in memory at once.
+
+Example:
+>>> chunks = [b'{"status": "SUCCESS", "records": [{"id": "1"}', b', {"id": "2"}]}']
+>>> list(iter_json_items(chunks, ('records',)))
+[{'id': '1'}, {'id': '2'}]
+"""
+import json
+import codecs
+from typing import Iterable, Iterator
+
+_WHITESPACE: str = ' \t\n\r'
+_NUMBER: str = '-+.0123456789eE'
+
+
+class _Reader():
+    '''Buffered text reader over an iterable of byte chunks'''
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._decode = json.JSONDecoder().raw_decode
+        self.buffer: str = ''
+        self.pos: int = 0
+        self.eof: bool = False
+
+    def fill(self) -> bool:
+        """Append the next chunk to the buffer, returning False at end of input"""
+        if self.eof:
+            return False
+        for chunk in self._chunks:
+            text = self._decoder.decode(chunk)
+            if text:
+                break
+        else:
+            text = self._decoder.decode(b'', final=True)
+            self.eof = True
+        # Consumed text is dropped so only the value being decoded is buffered
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character without consuming it"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                raise json.JSONDecodeError('Unexpected end of data', self.buffer, self.pos)
+
+    def expect(self, char: str) -> None:
+        """Consume the next non whitespace character, which must be char"""
+        if self.peek() != char:
+            raise json.JSONDecodeError(f'Expecting {char!r}', self.buffer, self.pos)
+        self.pos += 1
+
+    def value(self):
+        """Decode and consume the next complete JSON value"""
+        if self.peek() in _NUMBER:
+            # A number is only complete once a character following it is read
+            while not self.eof and not self.buffer[self.pos:].lstrip(_NUMBER):
+                self.fill()
+        while True:
+            try:
+                value, end = self._decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            self.pos = end
+            return value
+
+    def skip(self) -> None:
+        """Consume the next value, one element at a time for containers"""
+        start = self.peek()
+        if start == '[':
+            for _ in self.elements(decode=False):
+                pass
+        elif start == '{':
+            for _ in self.members():
+                self.skip()
+        else:
+            self.value()
+
+    def members(self) -> Iterator:
+        """Yield the keys of an object, leaving the reader at each value"""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            yield key
+            separator = self.peek()
+            self.pos += 1
+            if separator == '}':
+                return
+            if separator != ',':
+                raise json.JSONDecodeError("Expecting ',' delimiter", self.buffer, self.pos - 1)
+
+    def elements(self, decode: bool = True) -> Iterator:
+        """Yield the values of an array one at a time, or skip them if not decode"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            if decode:
+                yield self.value()
+            else:
+                self.skip()
+                yield None
+            separator = self.peek()
+            self.pos += 1
+            if separator == ']':
+                return
+            if separator != ',':
+                raise json.JSONDecodeError("Expecting ',' delimiter", self.buffer, self.pos - 1)
+
+
+def _descend(reader: _Reader, path: tuple) -> Iterator:
+    """Yield the items of the container at path within the current value"""
+    start = reader.peek()
+    if path and start == '{':
+        for key in reader.members():
+            if key == path[0]:
+                yield from _descend(reader, path[1:])
+            else:
+                reader.skip()
+    elif not path and start == '[':
+        yield from reader.elements()
+    elif not path and start == '{':
+        for key in reader.members():
+            yield key, reader.value()
+    else:
+        # Not a container, or the path does not continue through it
+        reader.skip()
+
+def iter_json_items(chunks: Iterable[bytes], path: tuple) -> Iterator:
+    """Yield the items of a nested JSON container while reading its bytes
+
+    Args:
+    chunks: Iterable of byte chunks forming a JSON document, e.g. an
+        httpx response's iter_bytes()
+    path: Keys leading from the top level object to the container
+
+    Yields:
+    The values of an array container, or (key, value) pairs of an object
+    container. Nothing is yielded if the path does not exist.
+
+    Raises:
+    json.JSONDecodeError: If the document is not valid JSON
+    """
+    reader = _Reader(chunks)
+    yield from _descend(reader, tuple(path))
+    # Only whitespace may follow the document
+    while True:
+        if reader.buffer[reader.pos:].strip(_WHITESPACE):
+            raise json.JSONDecodeError('Extra data', reader.buffer, reader.pos)
+        reader.pos = len(reader.buffer)
+        if not reader.fill():
+            return
@@ -1,17 +1,79 @@
 """Utilities
 """
-import time
+import atexit
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator
 import httpx
 
-from .const import ApiError, ApiFailure
-from .const import API_KEY, API_SECRET_KEY, BASE_URL, BASE_URL_V4, VALID_HTTP_RESPONSE, RATE_LIMIT
-from .const import RETRIES, TIMEOUT, HTTP2
+from .const import API_KEY, API_SECRET_KEY, BASE_URL, BASE_URL_V4
+from .const import RATE_LIMIT, RATE_BURST, RETRIES, CACHE_TTL, CACHE_SIZE
+from .cache import RecordCache
+from .client import PorkbunClient
+# Transport and response helpers remain importable from pyrkbun.util
+from .client import set_transport, get_transport, parse_response # pylint: disable = unused-import
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+
+# Default rate limiter shared by all API calls in this process, including
+# calls made from other threads and from pyrkbun.aio coroutines
+RATE_LIMITER = RateLimiter.from_interval(RATE_LIMIT, RATE_BURST)
+
+# DNS retrieve cache shared by module level API calls, enabled by PYRK_CACHE_TTL
+RECORD_CACHE = RecordCache(CACHE_TTL, CACHE_SIZE) if CACHE_TTL else None
+
+# Clients used by module level API calls, keyed by transport retry count.
+# Reusing a client keeps connections alive between calls so that TCP, TLS and
+# HTTP/2 negotiation is only paid once per pooled connection.
+_DEFAULT_CLIENTS: dict = {}
+# Request and response hooks shared by the default clients, see pyrkbun.metrics
+DEFAULT_HOOKS: dict = {'request': [], 'response': []}
+_DEFAULT_CLIENTS_LOCK = threading.Lock()
+
+def default_client(retries: int = RETRIES) -> PorkbunClient:
+    """Return the client used by module level API calls
+
+    Default clients are configured from the environment and share the
+    RATE_LIMITER, RECORD_CACHE, DEFAULT_HOOKS and retry policies of the
+    process. Pool sizing is controlled by the PYRK_POOL_CONNECTIONS,
+    PYRK_POOL_KEEPALIVE and PYRK_KEEPALIVE_EXPIRY environment variables.
+    """
+    client = _DEFAULT_CLIENTS.get(retries)
+    if client is not None:
+        return client
+    with _DEFAULT_CLIENTS_LOCK:
+        client = _DEFAULT_CLIENTS.get(retries)
+        if client is None:
+            client = PorkbunClient(rate_limit=RATE_LIMITER, retries=retries,
+                                   hooks=DEFAULT_HOOKS, cache=RECORD_CACHE)
+            _DEFAULT_CLIENTS[retries] = client
+    return client
+
+def get_http_client(retries: int = RETRIES) -> httpx.Client:
+    """Return the pooled http client of the default client for the retry count"""
+    return default_client(retries).http_client()
+
+def close_http_clients() -> None:
+    """Close all pooled http clients of the default clients
+
+    A new connection pool will be transparently created by the next API call.
+    """
+    with _DEFAULT_CLIENTS_LOCK:
+        clients = list(_DEFAULT_CLIENTS.values())
+    for client in clients:
+        client.close()
+
+atexit.register(close_http_clients)
 
 def api_post(path: str,
              payload: dict = None,
              auth: bool = True,
              force_v4: bool = False,
-             retries: int = RETRIES) -> dict:
+             retries: int = RETRIES,
+             limiter: RateLimiter = None,
+             policy: RetryPolicy = None,
+             client: PorkbunClient = None) -> dict:
     """Format request and post to API endpoint
 
     Used by package modules to condoliate logic for API calls.
@@ -24,6 +86,17 @@ def api_post(path: str,
         Defaults to empty dict
     auth (optional): Does the API request require authentication.
         Defaults to True which atuo updates payload with auth data
+    limiter (optional): Rate limiter to wait on before sending the request.
+        Defaults to the rate limiter of the client, which for module level
+        calls is the shared RATE_LIMITER configured from the PYRK_RATE and
+        PYRK_BURST environment variables
+    policy (optional): Retry policy for the request. Defaults to the
+        policy configured for the endpoint class of the path (see
+        pyrkbun.retry). Retries back off exponentially with jitter and
+        honour any Retry-After header. Throttling responses also slow down
+        the limiter for all callers.
+    client (optional): PorkbunClient to send the request with. Defaults
+        to the client configured from the environment
 
     Rasies:
     ApiError(): If the API returns a non-200 status code an error will be
@@ -31,37 +104,99 @@ def api_post(path: str,
     ApiFailure(): If JSON decoding of the returned data fails this error
         will be raised encapsulating the content returned
     """
+    if client is not None:
+        return client.post(path, payload, auth, force_v4, policy, limiter)
     payload = {} if payload is None else payload
-    base_url = BASE_URL_V4 if force_v4 else BASE_URL
     if auth:
-        payload.update({'secretapikey': API_SECRET_KEY,'apikey': API_KEY})
-    transport = httpx.HTTPTransport(retries=retries)
-    headers = {'content-type': 'application/json'}
-    http_client = httpx.Client(http2=HTTP2, base_url=base_url, headers=headers, transport=transport, timeout=TIMEOUT)
-    with http_client as client:
-        time.sleep(RATE_LIMIT)
-        response = client.post(path, json=payload)
-
+        add_auth(payload)
     try:
-        result: dict = response.json()
-    except ValueError as error:
-        print(response.status_code)
-        print(response.content)
-        raise ApiFailure(response.status_code, response.content) from error
-
-    # Remove api auth data added to keys to prevent accidental exposure and allow
-    # reuse of dicts provided to create and update functions
+        return default_client(retries).post(path, payload, False, force_v4, policy, limiter,
+                                            BASE_URL_V4 if force_v4 else BASE_URL)
+    finally:
+        strip_auth(payload)
+
+def api_stream(path: str,
+               items: tuple,
+               payload: dict = None,
+               auth: bool = True,
+               retries: int = RETRIES,
+               client: PorkbunClient = None) -> Iterator:
+    """Post to API endpoint and yield the items of the response incrementally
+
+    Streaming equivalent of api_post, see PorkbunClient.iter_items.
+
+    Args:
+    path: Section of API path that extends base URL
+    items: Keys leading to the container of items in the response,
+        e.g. ('records',)
+    payload (optional): JSON payload for API request formatted as dict
+    auth (optional): Does the API request require authentication
+    client (optional): PorkbunClient to send the request with. Defaults
+        to the client configured from the environment
+    """
+    if client is not None:
+        yield from client.iter_items(path, items, payload, auth)
+        return
+    # Auth is added to a copy as the request is only sent once iterated
+    body = {} if payload is None else dict(payload)
+    if auth:
+        add_auth(body)
+    yield from default_client(retries).iter_items(path, items, body, False, base_url=BASE_URL)
+
+def add_auth(payload: dict) -> None:
+    """Update request payload with API auth data"""
+    payload.update({'secretapikey': API_SECRET_KEY,'apikey': API_KEY})
+
+def strip_auth(payload: dict) -> None:
+    """Remove API auth data from request payload
+
+    Auth data added to payloads is removed to prevent accidental exposure
+    and allow reuse of dicts provided to create and update functions
+    """
     payload.pop('apikey', None)
     payload.pop('secretapikey', None)
 
-    # pylint: disable=no-else-return
-    if response.status_code in VALID_HTTP_RESPONSE:
-        return result
-    else:
-        result.update({'http_status': response.status_code})
-        raise ApiError(**result)
+def concurrent_map(func: Callable,
+                   items: Iterable,
+                   concurrency: int = 1) -> Iterator:
+    """Apply func to items using a pool of threads, yielding results in input order
+
+    At most a small multiple of concurrency items are in flight at any time,
+    so items may be a lazily produced iterable of any length. API calls made
+    by func share the process wide rate limiter. Exceptions raised by func
+    are re-raised when their result is reached, and exceptions raised by
+    items once the results of the items before them have been yielded.
+
+    Args:
+    func: Callable taking a single item
+    items: Iterable of items to process
+    concurrency (optional): Number of worker threads. Defaults to 1 which
+        runs func in the calling thread without a pool
+    """
+    if concurrency <= 1:
+        yield from map(func, items)
+        return
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending: deque = deque()
+        while True:
+            try:
+                item = next(items)
+            except StopIteration:
+                break
+            except Exception:
+                # Results of items already in flight are yielded before an
+                # error raised by items itself
+                while pending:
+                    yield pending.popleft().result()
+                raise
+            pending.append(executor.submit(func, item))
+            if len(pending) >= concurrency * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
 
-def api_ping(ipv4: bool = False) -> dict:
+def api_ping(ipv4: bool = False, client: PorkbunClient = None) -> dict:
     """Basic request to poll API host and return your own IP
 
     Example:
@@ -77,5 +212,5 @@ def api_ping(ipv4: bool = False) -> dict:
     {'status': 'SUCCESS', 'yourIp': '198.51.100.45'}
     """
     path = '/ping'
-    response = api_post(path, force_v4=ipv4)
+    response = api_post(path, force_v4=ipv4, client=client)
     return response
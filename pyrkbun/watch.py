@@ -0,0 +1,187 @@
+"""Watch a zone for changes made outside of pyrkbun
+
+A ZoneWatcher polls the records of a domain and keeps a content hash of
+the last snapshot. Polls that find the zone unchanged are settled by
+comparing hashes alone, and lengthen the interval before the next poll up
+to a maximum. When the zone has changed, only the records added, changed
+and removed since the last snapshot are reported and the interval is reset.
+
+Example:
+>>> from pyrkbun.watch import watch_zone
+>>> for event in watch_zone('example.com', interval=60):
+...     print(event.action, event.record['name'], event.record['content'])
+changed www 198.51.100.46
+"""
+import time
+from datetime import datetime, timezone
+from dataclasses import dataclass, field
+from typing import Callable, Iterator
+import httpx
+
+from .dns import Dns
+from .const import ApiError, ApiFailure
+from .diff import normalise, record_key
+from .plan import zone_fingerprint
+
+# Event actions, in the order they are reported for a poll
+EVENTS: tuple = ('added', 'changed', 'removed')
+# Seconds between polls while the zone is changing
+INTERVAL: float = 60.0
+# Longest interval polls back off to while the zone is quiet
+MAX_INTERVAL: float = 900.0
+# Factor the interval grows by after each poll finding no changes
+BACKOFF: float = 2.0
+
+
+def is_auth_error(error: Exception) -> bool:
+    """Return True for API errors that polling again cannot recover from,
+    such as invalid API keys or a domain without API access"""
+    if not isinstance(error, ApiError):
+        return False
+    message = error.message.lower()
+    return error.http_status in (401, 403) or 'api key' in message or 'api access' in message
+
+
+@dataclass
+class ZoneEvent():
+    '''A record added, changed or removed between two polls of a zone
+
+    Args:
+    action: One of EVENTS
+    domain: Domain of the zone
+    record: Normalised record, see pyrkbun.diff.normalise(). For removed
+        records this is the record as last seen
+    previous (optional): Record before the change, for changed records
+    time (optional): ISO 8601 time of the poll that found the change
+    '''
+    action: str
+    domain: str
+    record: dict
+    previous: dict = None
+    time: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+
+    def to_dict(self) -> dict:
+        """Return the event as a JSON serialisable dict"""
+        result = {'event': self.action, 'domain': self.domain, 'time': self.time,
+                  'record': self.record}
+        if self.previous is not None:
+            result['previous'] = self.previous
+        return result
+
+
+class ZoneWatcher():
+    '''Poll a zone and report changes between snapshots
+
+    Args:
+    domain: Domain to watch
+    interval (optional): Seconds between polls while the zone is changing.
+        Defaults to INTERVAL
+    max_interval (optional): Longest interval between polls while the zone
+        is quiet. Defaults to MAX_INTERVAL
+    backoff (optional): Factor the interval grows by after each poll
+        finding no changes. Defaults to BACKOFF
+    client (optional): PorkbunClient used for API calls. Defaults to the
+        default client
+
+    Usage:
+    Call poll() to check the zone once, e.g. from a scheduler, or iterate
+    watch() to poll at the current interval until stopped.
+    '''
+
+    def __init__(self,
+                 domain: str,
+                 interval: float = INTERVAL,
+                 max_interval: float = MAX_INTERVAL,
+                 backoff: float = BACKOFF,
+                 client=None):
+        self.domain = domain
+        self.min_interval = interval
+        self.max_interval = max(interval, max_interval)
+        self.backoff = backoff
+        self.interval = interval
+        self.fingerprint: str = None
+        self.snapshot: dict = {}
+        self.polls = 0
+        self._dns = Dns if client is None else client.dns
+
+    def __repr__(self) -> str:
+        return (f'ZoneWatcher({self.domain!r}, interval={self.interval}, '
+                f'records={len(self.snapshot)})')
+
+    def poll(self) -> list[ZoneEvent]:
+        """Retrieve the zone and return the changes since the last poll
+
+        The first poll only records a snapshot and returns no events.
+        """
+        records = list(self._dns.iter_records(self.domain))
+        fingerprint = zone_fingerprint(records, self.domain)
+        self.polls += 1
+        if fingerprint == self.fingerprint:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+            return []
+        snapshot = {}
+        for record in records:
+            record = normalise(record, self.domain)
+            snapshot[record['id']] = record
+        events = [] if self.fingerprint is None else self._changes(snapshot)
+        self.fingerprint, self.snapshot = fingerprint, snapshot
+        self.interval = self.min_interval
+        return events
+
+    def _changes(self, snapshot: dict) -> list[ZoneEvent]:
+        """Compare a snapshot with the last, in EVENTS order"""
+        now = datetime.now(timezone.utc).isoformat()
+        added, changed = [], []
+        for record_id, record in snapshot.items():
+            previous = self.snapshot.get(record_id)
+            if previous is None:
+                added.append(ZoneEvent('added', self.domain, record, time=now))
+            elif record_key(previous) != record_key(record):
+                changed.append(ZoneEvent('changed', self.domain, record, previous, now))
+        removed = [ZoneEvent('removed', self.domain, record, time=now)
+                   for record_id, record in self.snapshot.items() if record_id not in snapshot]
+        return added + changed + removed
+
+    def watch(self,
+              polls: int = None,
+              sleep: Callable = time.sleep,
+              on_error: Callable = None) -> Iterator[ZoneEvent]:
+        """Poll the zone until stopped, yielding each change as it is found
+
+        Args:
+        polls (optional): Number of polls to make, including the first
+            which only records a snapshot. Defaults to polling forever
+        sleep (optional): Function called with the seconds to wait between
+            polls. Defaults to time.sleep
+        on_error (optional): Called with API and transport errors raised by a
+            poll, which is then retried at the current interval. Errors for
+            which is_auth_error() is True are always raised. Defaults to
+            raising the error
+        """
+        count = 0
+        while polls is None or count < polls:
+            if count:
+                sleep(self.interval)
+            count += 1
+            try:
+                events = self.poll()
+            except (ApiError, ApiFailure, httpx.HTTPError) as error:
+                if on_error is None or is_auth_error(error):
+                    raise
+                on_error(error)
+                continue
+            yield from events
+
+
+def watch_zone(domain: str, # pylint: disable = too-many-arguments
+               interval: float = INTERVAL,
+               max_interval: float = MAX_INTERVAL,
+               polls: int = None,
+               client=None,
+               on_error: Callable = None) -> Iterator[ZoneEvent]:
+    """Poll a zone until stopped, yielding records added, changed and removed
+
+    See ZoneWatcher and ZoneWatcher.watch() for arguments.
+    """
+    return ZoneWatcher(domain, interval, max_interval, client=client).watch(polls,
+                                                                            on_error=on_error)
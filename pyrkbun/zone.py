@@ -0,0 +1,249 @@
+"""In-memory snapshot of a domain's DNS records
+
+A DnsZone retrieves all records of a domain with a single API request and
+indexes them by record ID, by (name, type) and by content, so any number
+of lookups and filters can be answered without further API calls.
+
+Records created, edited or deleted through the zone are written to the
+API and the indexes updated in place, keeping the snapshot current
+without retrieving the zone again. Changes made outside of the zone are
+only picked up by refresh().
+
+Example:
+>>> import pyrkbun
+>>> zone = pyrkbun.DnsZone.load('example.com')
+>>> zone.get_records('A', 'www')
+[Dns(domain='example.com', record_type='A', content='198.51.100.45', ...)]
+>>> zone.find('198.51.100.45')
+[Dns(domain='example.com', record_type='A', content='198.51.100.45', ...)]
+
+Zones of many domains are retrieved concurrently with load_zones().
+"""
+from functools import partial
+from typing import Iterable, Iterator
+import httpx
+
+from .dns import Dns, _record_payload
+from .const import ApiError, ApiFailure
+from .util import concurrent_map
+
+
+class DnsZone():
+    '''Indexed snapshot of the DNS records of a domain
+
+    Args:
+    domain: Domain the records belong to
+    records (optional): Dns records to index. Defaults to an empty zone
+    client (optional): PorkbunClient used for API calls. Defaults to the
+        default client
+
+    Usage:
+    Use DnsZone.load() to retrieve a zone from the API. Records returned by
+    lookups are the indexed instances, so after modifying one pass it to
+    update() to write the change and re-index it.
+    '''
+
+    def __init__(self, domain: str, records: Iterable[Dns] = (), client=None):
+        self.domain = domain
+        self.client = client
+        self._dns = Dns if client is None else client.dns
+        self._clear()
+        for record in records:
+            self._index(record)
+
+    def __repr__(self) -> str:
+        return f'DnsZone({self.domain!r}, records={len(self)})'
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[Dns]:
+        return iter(list(self._by_id.values()))
+
+    def __contains__(self, record) -> bool:
+        if isinstance(record, Dns):
+            return self._by_id.get(record.record_id) is record
+        return record in self._by_id
+
+    @classmethod
+    def load(cls, domain: str, client=None) -> 'DnsZone':
+        """Retrieve all records of a domain with one API request
+
+        Example:
+        >>> zone = pyrkbun.DnsZone.load('example.com')
+        >>> len(zone)
+        12
+        """
+        zone = cls(domain, client=client)
+        zone.refresh()
+        return zone
+
+    def refresh(self) -> None:
+        """Replace the snapshot with the records currently held by the API"""
+        records = self._dns.iter_records(self.domain)
+        self._clear()
+        for record in records:
+            self._index(record)
+
+    def _clear(self) -> None:
+        self._by_id: dict = {}
+        self._by_name_type: dict = {}
+        self._by_content: dict = {}
+        # Index keys of each record as last indexed, used to re-index
+        # records after their attributes have been modified
+        self._keys: dict = {}
+
+    def _index(self, record: Dns) -> None:
+        """Add a record to the indexes"""
+        if record.record_id in self._by_id:
+            self._unindex(record.record_id)
+        keys = ((record.name, record.record_type), record.content)
+        self._by_id[record.record_id] = record
+        self._by_name_type.setdefault(keys[0], []).append(record)
+        self._by_content.setdefault(keys[1], []).append(record)
+        self._keys[record.record_id] = keys
+
+    def _unindex(self, record_id: str) -> Dns:
+        """Remove a record from the indexes by ID"""
+        record = self._by_id.pop(record_id)
+        name_type, content = self._keys.pop(record_id)
+        for index, key in ((self._by_name_type, name_type), (self._by_content, content)):
+            entries = index[key]
+            entries.remove(record)
+            if not entries:
+                del index[key]
+        return record
+
+    def _name(self, name: str) -> str:
+        """Normalise a record name as Dns does"""
+        return '' if name == self.domain else name.removesuffix(f'.{self.domain}')
+
+    @property
+    def records(self) -> list[Dns]:
+        """All records of the zone"""
+        return list(self._by_id.values())
+
+    def get(self, record_id: str) -> Dns:
+        """Return the record with an ID, or None"""
+        return self._by_id.get(str(record_id))
+
+    def get_records(self,
+                    record_type: str = None,
+                    name: str = None,
+                    record_id: str = None) -> list[Dns]:
+        """Get records by ID or type and name, as Dns.get_records does
+
+        Example:
+        >>> zone.get_records('A', 'www')
+        [Dns(domain='example.com', record_type='A', content='198.51.100.45', ...)]
+        >>> zone.get_records('MX')
+        [Dns(domain='example.com', record_type='MX', ...), ...]
+        """
+        if record_id:
+            record = self.get(record_id)
+            return [] if record is None else [record]
+        if name is not None and record_type:
+            return list(self._by_name_type.get((self._name(name), record_type), ()))
+        return self.filter(record_type=record_type, name=name)
+
+    def find(self, content: str) -> list[Dns]:
+        """Return the records with content (e.g. an IP address)"""
+        return list(self._by_content.get(content, ()))
+
+    def filter(self,
+               record_type: str = None,
+               name: str = None,
+               content: str = None) -> list[Dns]:
+        """Return the records matching all of the given attributes"""
+        if content is not None:
+            candidates = self._by_content.get(content, ())
+        elif name is not None and record_type:
+            candidates = self._by_name_type.get((self._name(name), record_type), ())
+        else:
+            candidates = self._by_id.values()
+        name = None if name is None else self._name(name)
+        return [record for record in candidates
+                if (record_type is None or record.record_type == record_type)
+                and (name is None or record.name == name)]
+
+    def _check(self, record: Dns) -> None:
+        if record.domain != self.domain:
+            raise ValueError(f'Record domain {record.domain!r} is not {self.domain!r}')
+
+    def create(self, record: Dns) -> dict:
+        """Create a record and add it to the zone
+
+        Example:
+        >>> record = pyrkbun.dns('example.com', 'A', '198.51.100.46', 'api')
+        >>> zone.create(record)
+        {'status': 'SUCCESS', 'id': 253916853}
+        """
+        self._check(record)
+        response = self._dns.create_record(self.domain, _record_payload(record))
+        record.record_id = response['id']
+        self._index(record)
+        return response
+
+    def update(self, record: Dns) -> dict:
+        """Write the attributes of a record to the API and re-index it
+
+        Record ID MUST be populated.
+
+        Example:
+        >>> record = zone.get_records('A', 'www')[0]
+        >>> record.content = '198.51.100.47'
+        >>> zone.update(record)
+        {'status': 'SUCCESS'}
+        """
+        self._check(record)
+        response = self._dns.edit_record(self.domain, _record_payload(record),
+                                         record_id=record.record_id)
+        self._index(record)
+        return response
+
+    def delete(self, record: Dns) -> dict:
+        """Delete a record and remove it from the zone
+
+        Record ID MUST be populated.
+        """
+        self._check(record)
+        response = self._dns.delete_record(self.domain, record_id=record.record_id)
+        if record.record_id in self._by_id:
+            self._unindex(record.record_id)
+        return response
+
+
+def _load_zone(client, domain: str) -> tuple:
+    """Load the zone of one domain, returning (domain, zone, error)"""
+    try:
+        return domain, DnsZone.load(domain, client), None
+    except (ApiError, ApiFailure, httpx.HTTPError) as error:
+        return domain, None, error
+
+def load_zones(domains: Iterable[str],
+               client=None,
+               concurrency: int = 4) -> Iterator[tuple]:
+    """Retrieve the zones of many domains concurrently
+
+    Requests share the rate limiter of the client, which for the default
+    client is the process wide RATE_LIMITER, so concurrency only helps up to
+    the configured rate. A domain that cannot be retrieved does not stop the
+    others: its error is yielded in place of its zone.
+
+    Args:
+    domains: Domains to retrieve, may be a lazily produced iterable
+    client (optional): PorkbunClient used for API calls. Defaults to the
+        default client
+    concurrency (optional): Number of zones retrieved in parallel. Defaults to 4
+
+    Yields:
+    Tuples of (domain, DnsZone, None), or (domain, None, error) for domains
+    that failed, in the order domains are given
+
+    Example:
+    >>> for domain, zone, error in pyrkbun.zone.load_zones(['example.com', 'example.org']):
+    ...     print(domain, error or len(zone))
+    example.com 12
+    example.org Invalid domain.
+    """
+    return concurrent_map(partial(_load_zone, client), domains, concurrency)
@@ -0,0 +1,268 @@
+"""Read and write DNS records as BIND master (zone) files
+
+parse_zone() reads the lines of a zone file into record dicts in the format
+used by bulk operations, so zone files can be fed to the bulk, plan and
+diff functions directly. format_zone() writes records, e.g. those returned
+by Dns.get_records(), as a zone file.
+
+Supported syntax covers $ORIGIN and $TTL directives, absolute, relative and
+@ names, owners inherited from the previous record, TTL units (e.g. 1h30m),
+record classes, comments and records continued over several lines with
+parentheses. MX and SRV priorities are moved into the 'prio' field, and
+comments on a record line are read into its notes. SOA records are skipped
+as the SOA of a zone is managed by Porkbun. $INCLUDE and $GENERATE are not
+supported.
+
+Example:
+>>> from pyrkbun.zonefile import read_zone, write_zone
+>>> write_zone(pyrkbun.dns.get_records('example.com'), 'example.com', 'example.com.zone')
+>>> list(read_zone('example.com.zone', 'example.com'))[0]
+{'name': 'www', 'type': 'A', 'content': '198.51.100.45', 'ttl': '600', 'prio': '0', 'notes': ''}
+"""
+import re
+from typing import Iterable, Iterator
+
+from .const import SUPPORTED_DNS_RECORD_TYPES
+from .diff import normalise
+
+# TTL of records before any $TTL directive or explicit TTL
+DEFAULT_TTL: str = '600'
+# Record types whose content is a single domain name
+NAME_TYPES: frozenset = frozenset({'CNAME', 'ALIAS', 'NS'})
+CLASSES: frozenset = frozenset({'IN', 'CH', 'HS', 'CS'})
+# Longest string allowed in a single quoted TXT string
+TXT_CHUNK: int = 255
+
+_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|;|[()]|[^\s"();]+|"')
+_ESCAPE = re.compile(r'\\(\d{3}|.)')
+_TTL_UNITS: dict = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+_TTL_PART = re.compile(r'(\d+)([smhdw])', re.I)
+_DATA_FIELDS: dict = {'MX': 2, 'SRV': 4, 'CNAME': 1, 'ALIAS': 1, 'NS': 1}
+
+def _tokenise(line: str, depth: int) -> tuple:
+    """Split a line into tokens, returning (tokens, depth, comment)
+
+    Parentheses are dropped from the tokens and counted in depth. Quoted
+    strings are returned with their quotes.
+    """
+    tokens = []
+    for match in _TOKEN.finditer(line):
+        token = match.group()
+        if token == ';':
+            return tokens, depth, line[match.end():].strip()
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth -= 1
+            if depth < 0:
+                raise ValueError('unbalanced parentheses')
+        elif token == '"':
+            raise ValueError('unterminated string')
+        else:
+            tokens.append(token)
+    return tokens, depth, ''
+
+def _ttl(token: str) -> str:
+    """Return a TTL in seconds, converting units such as 1h30m"""
+    if token.isdigit():
+        return token
+    parts = _TTL_PART.findall(token)
+    if not parts or ''.join(number + unit for number, unit in parts) != token:
+        raise ValueError(f'invalid TTL {token!r}')
+    return str(sum(int(number) * _TTL_UNITS[unit.lower()] for number, unit in parts))
+
+def _absolute(name: str, origin: str) -> str:
+    """Return a name from a zone file as a domain without the trailing dot"""
+    if name == '@':
+        return origin
+    if name.endswith('.'):
+        return name[:-1]
+    return f'{name}.{origin}' if origin else name
+
+def _unquote(token: str) -> str:
+    """Return the text of a character string, quoted or not"""
+    if token[0] == '"':
+        token = token[1:-1]
+    if '\\' not in token:
+        return token
+    return _ESCAPE.sub(lambda match: chr(int(match.group(1))) if match.group(1).isdigit()
+                       else match.group(1), token)
+
+def _content(record_type: str, rdata: list, origin: str) -> tuple:
+    """Return the (content, prio) of a record from its data fields"""
+    expected = _DATA_FIELDS.get(record_type)
+    if expected is not None and len(rdata) != expected:
+        raise ValueError(f'{record_type} records take {expected} data fields, '
+                         f'found {len(rdata)}')
+    if record_type == 'MX':
+        return _absolute(rdata[1], origin), rdata[0]
+    if record_type == 'SRV':
+        return f'{rdata[1]} {rdata[2]} {_absolute(rdata[3], origin)}', rdata[0]
+    if record_type in NAME_TYPES:
+        return _absolute(rdata[0], origin), '0'
+    if not rdata:
+        raise ValueError('missing record data')
+    if record_type == 'TXT':
+        return ''.join(_unquote(token) for token in rdata), '0'
+    return ' '.join(rdata), '0'
+
+def parse_zone(lines: Iterable[str], domain: str, ttl: str = DEFAULT_TTL) -> Iterator[dict]:
+    """Lazily parse the lines of a zone file into record dicts
+
+    Args:
+    lines: Lines of the zone file, e.g. an open file
+    domain: Domain of the zone. Also the initial origin, which $ORIGIN
+        directives may change
+    ttl (optional): TTL of records before any $TTL directive or explicit
+        TTL. Defaults to DEFAULT_TTL
+
+    Yields:
+    Dicts with name (relative to domain), type, content, ttl, prio and notes
+
+    Raises:
+    ValueError: If a record cannot be parsed, is of a type Porkbun does not
+        support or is outside of the zone
+    """
+    domain = domain.lower().rstrip('.')
+    suffix = f'.{domain}'
+    origin = domain
+    explicit_ttl = False
+    owner = None
+    pending = None
+    depth = 0
+    classes, supported = CLASSES, SUPPORTED_DNS_RECORD_TYPES
+    for number, line in enumerate(lines, 1):
+        try:
+            if pending is None:
+                start = number
+                # Most lines hold a single record with no quotes or comments
+                if '"' in line or ';' in line or '(' in line or ')' in line:
+                    tokens, depth, comment = _tokenise(line, 0)
+                else:
+                    tokens, comment = line.split(), ''
+                if depth:
+                    inherit = line[0] in ' \t'
+                    pending, comments = tokens, [comment] if comment else []
+                    continue
+                if not tokens:
+                    continue
+                inherit = line[0] in ' \t'
+            else:
+                tokens, depth, comment = _tokenise(line, depth)
+                pending.extend(tokens)
+                if comment:
+                    comments.append(comment)
+                if depth:
+                    continue
+                tokens, comment, pending = pending, ' '.join(comments), None
+
+            first = tokens[0]
+            if first[0] == '$':
+                directive = first.upper()
+                if directive == '$ORIGIN':
+                    origin = _absolute(tokens[1], origin).lower()
+                elif directive == '$TTL':
+                    ttl, explicit_ttl = _ttl(tokens[1]), True
+                else:
+                    raise ValueError(f'unsupported directive {first}')
+                continue
+
+            index = 0
+            if not inherit:
+                owner = _absolute(first, origin).lower()
+                index = 1
+            elif owner is None:
+                raise ValueError('missing owner name')
+            record_ttl = ttl
+            while True:
+                token = tokens[index]
+                if token[0].isdigit():
+                    record_ttl = _ttl(token)
+                    index += 1
+                    continue
+                record_type = token.upper()
+                if record_type not in classes:
+                    break
+                index += 1
+            # Without $TTL, the last explicit TTL applies to later records
+            if not explicit_ttl:
+                ttl = record_ttl
+            if record_type == 'SOA':
+                continue
+            if record_type not in supported:
+                raise ValueError(f'unsupported record type {token}')
+            content, prio = _content(record_type, tokens[index + 1:], origin)
+
+            if owner == domain:
+                name = ''
+            elif owner.endswith(suffix):
+                name = owner[:-len(suffix)]
+            else:
+                raise ValueError(f'{owner} is outside of {domain}')
+        except IndexError:
+            raise ValueError(f'Invalid record on line {start}: missing fields') from None
+        except ValueError as error:
+            raise ValueError(f'Invalid record on line {start}: {error}') from None
+        yield {'name': name, 'type': record_type, 'content': content,
+               'ttl': record_ttl, 'prio': prio, 'notes': comment}
+    if pending is not None:
+        raise ValueError(f'Invalid record on line {start}: unbalanced parentheses')
+
+def read_zone(path: str, domain: str, ttl: str = DEFAULT_TTL) -> Iterator[dict]:
+    """Lazily parse the records of a zone file, see parse_zone()"""
+    with open(path, 'r', encoding='utf8') as file:
+        yield from parse_zone(file, domain, ttl)
+
+def _fqdn(name: str) -> str:
+    """Return a domain name as an absolute zone file name"""
+    return name if not name or name.endswith('.') else f'{name}.'
+
+def _quote(text: str) -> str:
+    """Return text as quoted character strings of at most TXT_CHUNK characters"""
+    chunks = [text[start:start + TXT_CHUNK] for start in range(0, len(text), TXT_CHUNK)] or ['']
+    return ' '.join('"' + chunk.replace('\\', '\\\\').replace('"', '\\"') + '"'
+                    for chunk in chunks)
+
+def format_zone(records: Iterable, domain: str) -> Iterator[str]:
+    """Lazily format records as the lines of a zone file
+
+    Names are written relative to an $ORIGIN of the domain and all other
+    domain names as absolute names. Notes are written as comments, which
+    parse_zone() reads back into notes.
+
+    Args:
+    records: Records as dicts or Dns instances, e.g. from Dns.get_records()
+    domain: Domain of the zone
+    """
+    domain = domain.lower().rstrip('.')
+    yield f'$ORIGIN {domain}.'
+    for record in records:
+        record = normalise(record, domain)
+        record_type, content = record['type'], record['content']
+        if record_type == 'MX':
+            data = f'{record["prio"]} {_fqdn(content)}'
+        elif record_type == 'SRV':
+            fields = content.split()
+            if len(fields) == 3:
+                fields[2] = _fqdn(fields[2])
+            data = f'{record["prio"]} {" ".join(fields)}'
+        elif record_type in NAME_TYPES:
+            data = _fqdn(content)
+        elif record_type == 'TXT':
+            data = _quote(content)
+        else:
+            data = content
+        line = f'{record["name"] or "@"}\t{record["ttl"]}\tIN\t{record_type}\t{data}'
+        if record['notes']:
+            line += f' ; {" ".join(record["notes"].split())}'
+        yield line
+
+def write_zone(records: Iterable, domain: str, path: str) -> int:
+    """Write records to a zone file, returning the number of records written"""
+    lines = format_zone(records, domain)
+    count = 0
+    with open(path, 'w', encoding='utf8') as file:
+        file.write(next(lines) + '\n')
+        for count, line in enumerate(lines, 1):
+            file.write(line + '\n')
+    return count